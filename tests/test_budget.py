@@ -0,0 +1,134 @@
+import pytest
+from smolagents.models import ChatMessage, TokenUsage
+
+from yowon import agent, budget
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class UsageModel:
+    model_id = "fake"
+
+    def __init__(self, content="Thought: go\nCode:\n```py\nprint('partial')\n```<end_code>"):
+        self.content = content
+        self.kwargs = []
+
+    def generate(self, messages, **kwargs):
+        self.kwargs.append(kwargs)
+        return ChatMessage(
+            role="assistant",
+            content=self.content,
+            token_usage=TokenUsage(input_tokens=7, output_tokens=3),
+        )
+
+
+def test_budget_tracks_time_and_tokens():
+    clock = Clock()
+    b = budget.Budget(timeout=10, max_tokens=100, clock=clock).start()
+    clock.now = 4
+    assert b.remaining() == 6
+    b.charge(100)
+    assert b.remaining_tokens() == 0
+    assert b.expired()
+
+
+def test_tighten_takes_smallest_limits():
+    clock = Clock()
+    outer = budget.Budget(timeout=5, max_steps=3, max_tokens=50, clock=clock).start()
+    clock.now = 2
+    outer.charge(20)
+    inner = budget.Budget(timeout=60, max_steps=10, clock=clock).tighten(outer)
+    assert (inner.timeout, inner.max_steps, inner.max_tokens) == (3, 3, 30)
+    assert budget.Budget(timeout=1).tighten(None).timeout == 1
+
+
+def test_child_budget_charges_and_expires_with_parent():
+    parent = budget.Budget(max_tokens=30)
+    first = budget.Budget().tighten(parent)
+    second = budget.Budget().tighten(parent)
+    first.charge(20)
+    assert parent.tokens_used == 20
+    assert second.remaining_tokens() == 10
+    second.charge(10)
+    assert first.expired()
+
+
+def test_budgeted_model_passes_timeout_and_charges_tokens():
+    inner = UsageModel()
+    model = budget.BudgetedModel(inner)
+    model.generate([])
+    assert inner.kwargs == [{}]
+
+    b = budget.Budget(timeout=30, max_tokens=15)
+    with b.active():
+        model.generate([])
+        assert 0 < inner.kwargs[-1]["timeout"] <= 30
+        assert b.tokens_used == 10
+        model.generate([])
+        with pytest.raises(budget.BudgetExceededError):
+            model.generate([])
+
+
+def test_model_leaves_retries_to_budget(monkeypatch):
+    captured = {}
+    monkeypatch.setattr(agent, "OpenAIServerModel", lambda **kw: captured.update(kw))
+    agent.create_model(api_key="k")
+    assert captured["client_kwargs"] == {"max_retries": 0}
+
+
+def test_session_returns_partial_answer_when_budget_runs_out(monkeypatch):
+    monkeypatch.setattr(agent, "create_model", lambda **kwargs: UsageModel())
+    session = agent.ChatSession(token_budget=5)
+    assert "partial" in session.ask("work forever")
+
+
+def test_partial_answer_comes_from_current_turn(monkeypatch):
+    class TurnStep:
+        def __init__(self, output):
+            self.action_output = output
+
+        def dict(self):
+            return {"action_output": self.action_output}
+
+    class TurnAgent:
+        def __init__(self):
+            self.memory = type("Memory", (), {"steps": []})()
+
+        def run(self, prompt, reset=True, **kwargs):
+            if prompt == "first":
+                self.memory.steps.append(TurnStep("TURN1-ANSWER"))
+                return "TURN1-ANSWER"
+            raise budget.BudgetExceededError(prompt)
+
+    monkeypatch.setattr(agent, "create_agent", lambda **kwargs: TurnAgent())
+    session = agent.ChatSession()
+    assert session.ask("first") == "TURN1-ANSWER"
+    answer = session.ask("second", budget.Budget(timeout=0))
+    assert answer == "No answer before the budget ran out."
+
+
+def test_session_passes_max_steps(monkeypatch):
+    calls = []
+
+    class StepAgent:
+        def run(self, prompt, reset=True, **kwargs):
+            calls.append(kwargs)
+            return prompt
+
+    monkeypatch.setattr(agent, "create_agent", lambda **kwargs: StepAgent())
+    session = agent.ChatSession(max_steps=8)
+    session.ask("a")
+    session.ask("b", budget.Budget(max_steps=2))
+    assert calls == [{"max_steps": 8}, {"max_steps": 2}]
+
+
+def test_subprocess_timeout_returns_partial_output():
+    py = agent.PythonAgent(timeout=5)
+    code = "import time; print('early', flush=True); time.sleep(5)"
+    assert py.ask(code, budget.Budget(timeout=0.5)) == "early"
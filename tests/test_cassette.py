@@ -0,0 +1,81 @@
+import pytest
+from smolagents.models import ChatMessage, TokenUsage
+
+from yowon import agent, cassette
+
+ANSWER = "Thought: done\nCode:\n```py\nfinal_answer('42')\n```<end_code>"
+
+
+class FakeModel:
+    model_id = "fake"
+
+    def __init__(self):
+        self.calls = 0
+
+    def generate(self, messages, stop_sequences=None, **kwargs):
+        self.calls += 1
+        return ChatMessage(
+            role="assistant",
+            content=f"{ANSWER}#{self.calls}",
+            token_usage=TokenUsage(input_tokens=10, output_tokens=2),
+        )
+
+
+def test_replays_recorded_responses_in_order(tmp_path):
+    recorder = cassette.RecordingModel(FakeModel(), tmp_path)
+    first = recorder.generate([{"role": "user", "content": "hi"}], timeout=3)
+    second = recorder.generate([{"role": "user", "content": "hi"}])
+
+    replay = cassette.ReplayModel(tmp_path, model_id="fake")
+    assert replay.generate([{"role": "user", "content": "hi"}]).content == first.content
+    replayed = replay.generate([{"role": "user", "content": "hi"}], timeout=1)
+    assert replayed.content == second.content
+    assert replayed.token_usage.input_tokens == 10
+    with pytest.raises(LookupError):
+        replay.generate([{"role": "user", "content": "hi"}])
+
+
+def test_replay_speed_scales_latency(tmp_path, monkeypatch):
+    cassette.Cassette(tmp_path).append("k", 2.0, ChatMessage(role="assistant"))
+    slept = []
+    monkeypatch.setattr(cassette.time, "sleep", slept.append)
+    monkeypatch.setattr(cassette, "request_key", lambda *args, **kwargs: "k")
+    cassette.ReplayModel(tmp_path, speed=4).generate([])
+    cassette.ReplayModel(tmp_path, speed=0).generate([])
+    assert slept == [0.5]
+
+
+def test_replay_does_not_build_openai_model(tmp_path, monkeypatch):
+    def no_model(**kwargs):
+        raise AssertionError("model should not be created")
+
+    cassette.Cassette(tmp_path)
+    (tmp_path / cassette.INDEX_FILE).write_text("")
+    monkeypatch.setattr(agent, "OpenAIServerModel", no_model)
+    ag = agent.create_agent(replay=tmp_path)
+    assert isinstance(ag.model.model, cassette.ReplayModel)
+
+
+def test_session_round_trip(tmp_path, monkeypatch):
+    fake = FakeModel()
+    monkeypatch.setattr(agent, "create_model", lambda **kwargs: fake)
+    recorded = agent.ChatSession(model_id="fake", record=tmp_path).ask("question")
+    replayed = agent.ChatSession(model_id="fake", replay=tmp_path).ask("question")
+    assert recorded == replayed == "42"
+    assert fake.calls == 1
+
+
+def test_sub_agents_use_their_own_cassettes(tmp_path, monkeypatch):
+    fake = FakeModel()
+    monkeypatch.setattr(agent, "create_model", lambda **kwargs: fake)
+    config = {"agents": {"a": {"model": "fake"}, "py": {"type": "python"}}}
+    agent.create_multi_session(config, record=tmp_path).ask("question", "a")
+    assert (tmp_path / "agents" / "a" / cassette.INDEX_FILE).exists()
+
+    def no_model(**kwargs):
+        raise AssertionError("model should not be created")
+
+    monkeypatch.setattr(agent, "create_model", no_model)
+    replayed = agent.create_multi_session(config, replay=tmp_path)
+    assert replayed.ask("question", "a") == "42"
+    assert fake.calls == 1
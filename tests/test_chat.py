@@ -94,7 +94,7 @@ def test_multi_session_dispatch(monkeypatch):
         def __init__(self, name):
             self.name = name
 
-        def ask(self, prompt: str) -> str:
+        def ask(self, prompt: str, budget=None) -> str:
             return f"{self.name}:{prompt}"
 
     sessions = {"a": Dummy("a"), "b": Dummy("b")}
@@ -110,7 +110,7 @@ def test_multi_session_from_config(monkeypatch):
         def __init__(self, model_id, **kwargs):
             built[model_id] = kwargs
 
-        def ask(self, prompt: str) -> str:  # pragma: no cover - not used
+        def ask(self, prompt: str, budget=None) -> str:  # pragma: no cover - not used
             return prompt
 
     monkeypatch.setattr(agent, "ChatSession", Dummy)
@@ -133,7 +133,7 @@ def test_multi_agent_interaction(monkeypatch):
         def __init__(self, model_id="llm", **kwargs):
             self.model_id = model_id
 
-        def ask(self, prompt: str) -> str:
+        def ask(self, prompt: str, budget=None) -> str:
             return f"{self.model_id}:{prompt}"
 
     monkeypatch.setattr(agent, "ChatSession", Dummy)
@@ -148,3 +148,109 @@ def test_multi_agent_interaction(monkeypatch):
     assert multi.ask("print(2+3)", "py") == "5"
     assert multi.ask("echo hi", "sh") == "hi"
     assert multi.ask("hello", "llm") == "codex1:hello"
+
+
+class FakeStep:
+    def __init__(self, text):
+        self.text = text
+
+    def dict(self):
+        return {"text": self.text}
+
+
+class FakeMemory:
+    def __init__(self):
+        self.steps = []
+
+
+class MemoryAgent:
+    def __init__(self):
+        self.memory = FakeMemory()
+
+    def run(self, prompt, reset=True, **kwargs):
+        if reset:
+            self.memory.steps.clear()
+        self.memory.steps.append(FakeStep(prompt))
+        return prompt
+
+
+def test_memory_usage_reports_steps(monkeypatch):
+    monkeypatch.setattr(agent, "create_agent", lambda **kwargs: MemoryAgent())
+    session = agent.ChatSession()
+    session.ask("hello")
+    usage = session.memory_usage()
+    assert usage["steps"] == 1
+    assert usage["bytes"] == len('{"text": "hello"}')
+
+
+def test_soft_limit_spills_old_steps(monkeypatch, tmp_path):
+    monkeypatch.setattr(agent, "create_agent", lambda **kwargs: MemoryAgent())
+    session = agent.ChatSession(memory_soft_limit=60, spill_dir=tmp_path)
+    for prompt in ["a" * 20, "b" * 20, "c" * 20]:
+        session.ask(prompt)
+    usage = session.memory_usage()
+    assert usage["steps"] == 1
+    assert usage["spilled_steps"] == 2
+    assert len(session._step_sizes) == 1
+    spilled = (tmp_path / f"{session.session_id}.jsonl").read_text().splitlines()
+    assert spilled == ['{"text": "%s"}' % ("a" * 20), '{"text": "%s"}' % ("b" * 20)]
+
+
+def test_hard_limit_evicts_session(monkeypatch):
+    fake = MemoryAgent()
+    monkeypatch.setattr(agent, "create_agent", lambda **kwargs: fake)
+    session = agent.ChatSession(memory_hard_limit=20)
+    session.ask("a" * 20)
+    assert session.memory_usage()["steps"] == 0
+    assert session.evictions == 1
+    session.ask("next")
+    assert fake.memory.steps[0].text == "next"
+
+
+def test_memory_limits_measure_each_step_once(monkeypatch):
+    monkeypatch.setattr(agent, "create_agent", lambda **kwargs: MemoryAgent())
+    measured = []
+    original = agent.step_size
+
+    def counting_size(step):
+        measured.append(step.text)
+        return original(step)
+
+    monkeypatch.setattr(agent, "step_size", counting_size)
+    unlimited = agent.ChatSession()
+    unlimited.ask("a")
+    assert measured == []
+    limited = agent.ChatSession(memory_soft_limit=1000)
+    for prompt in ["a", "b", "c"]:
+        limited.ask(prompt)
+    assert measured == ["a", "b", "c"]
+
+
+def test_memory_report_includes_sub_agents(monkeypatch):
+    monkeypatch.setattr(agent, "create_agent", lambda **kwargs: MemoryAgent())
+    lead = agent.ChatSession()
+    helper = agent.ChatSession()
+    helper.ask("hi")
+    multi = agent.MultiChatSession({"helper": helper, "py": agent.PythonAgent()})
+    report = agent.memory_report(lead, multi)
+    assert report["session"]["steps"] == 0
+    assert report["agents"] == {"helper": helper.memory_usage()}
+    assert agent.memory_report(lead)["agents"] == {}
+
+
+def test_fork_shares_model_with_empty_memory(monkeypatch):
+    class ModelAgent(MemoryAgent):
+        def __init__(self, model=None):
+            super().__init__()
+            self.model = model or object()
+
+    def fake_create_agent(**kwargs):
+        return ModelAgent(kwargs.get("model"))
+
+    monkeypatch.setattr(agent, "create_agent", fake_create_agent)
+    session = agent.ChatSession(timeout=5)
+    session.ask("hello")
+    forked = session.fork()
+    assert forked._agent.model is session._agent.model
+    assert forked.memory_usage()["steps"] == 0
+    assert forked.limits.timeout == 5
@@ -0,0 +1,230 @@
+import httpx
+import openai
+import pytest
+
+from yowon import agent, budget, endpoints
+
+REQUEST = httpx.Request("POST", "http://endpoint/v1/chat/completions")
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class Backend:
+    def __init__(self, name, fail=False, error=None):
+        self.name = name
+        self.fail = fail
+        self.error = error or openai.APIConnectionError(request=REQUEST)
+        self.calls = 0
+
+    def generate(self, messages, **kwargs):
+        self.calls += 1
+        if self.fail:
+            raise self.error
+        return f"{self.name}:{messages}"
+
+    def generate_stream(self, messages, **kwargs):
+        self.calls += 1
+        yield f"{self.name}:1"
+        if self.fail:
+            raise self.error
+        yield f"{self.name}:2"
+
+
+def test_fails_over_to_next_endpoint():
+    bad, good = Backend("bad", fail=True), Backend("good")
+    pool = endpoints.EndpointPool([endpoints.Endpoint(bad), endpoints.Endpoint(good)])
+    assert pool.generate("hi") == "good:hi"
+    assert bad.calls == 1
+    assert pool.endpoints[0].failures == 1
+
+
+def test_raises_when_all_endpoints_fail():
+    pool = endpoints.EndpointPool([endpoints.Endpoint(Backend("a", fail=True))])
+    with pytest.raises(openai.APIConnectionError):
+        pool.generate("hi")
+
+
+def test_client_errors_are_not_retried():
+    rejected = openai.BadRequestError(
+        "bad request",
+        response=httpx.Response(400, request=REQUEST),
+        body=None,
+    )
+    bad, good = Backend("bad", fail=True, error=rejected), Backend("good")
+    pool = endpoints.EndpointPool([endpoints.Endpoint(bad), endpoints.Endpoint(good)])
+    with pytest.raises(openai.BadRequestError):
+        pool.generate("hi")
+    assert good.calls == 0
+    assert pool.endpoints[0].failures == 0
+    assert pool.endpoints[0].outstanding == 0
+
+
+def test_closed_stream_releases_endpoint():
+    backend = Backend("a")
+    pool = endpoints.EndpointPool([endpoints.Endpoint(backend)])
+    stream = pool.generate_stream("hi")
+    assert next(stream) == "a:1"
+    assert pool.endpoints[0].outstanding == 1
+    stream.close()
+    assert pool.endpoints[0].outstanding == 0
+    assert pool.endpoints[0].failures == 0
+
+
+def test_failed_stream_counts_failure():
+    pool = endpoints.EndpointPool([endpoints.Endpoint(Backend("a", fail=True))])
+    with pytest.raises(openai.APIConnectionError):
+        list(pool.generate_stream("hi"))
+    assert pool.endpoints[0].outstanding == 0
+    assert pool.endpoints[0].failures == 1
+
+
+def test_failover_gets_remaining_budget():
+    clock = Clock()
+
+    class Hanging(Backend):
+        def generate(self, messages, **kwargs):
+            self.timeouts = getattr(self, "timeouts", []) + [kwargs["timeout"]]
+            clock.now += kwargs["timeout"]
+            raise openai.APITimeoutError(request=REQUEST)
+
+    first, second = Hanging("first"), Hanging("second")
+    pool = endpoints.EndpointPool(
+        [endpoints.Endpoint(first), endpoints.Endpoint(second)],
+        clock=clock,
+    )
+    with budget.Budget(timeout=5, clock=clock).active():
+        with pytest.raises(openai.APITimeoutError):
+            pool.generate("hi", timeout=5)
+    assert first.timeouts == [5]
+    assert second.calls == 0
+    assert [e.failures for e in pool.endpoints] == [0, 0]
+    assert [e.outstanding for e in pool.endpoints] == [0, 0]
+
+
+def test_failover_after_partial_budget():
+    clock = Clock()
+
+    class Slow(Backend):
+        def generate(self, messages, **kwargs):
+            self.timeout = kwargs["timeout"]
+            clock.now += 2
+            return super().generate(messages, **kwargs)
+
+    bad, good = Slow("bad", fail=True), Slow("good")
+    pool = endpoints.EndpointPool(
+        [endpoints.Endpoint(bad), endpoints.Endpoint(good)],
+        clock=clock,
+    )
+    with budget.Budget(timeout=5, clock=clock).active():
+        assert pool.generate("hi", timeout=5) == "good:hi"
+    assert (bad.timeout, good.timeout) == (5, 3)
+    assert pool.endpoints[0].failures == 1
+
+
+def test_circuit_opens_and_recovers():
+    clock = Clock()
+    flaky, good = Backend("flaky", fail=True), Backend("good")
+    pool = endpoints.EndpointPool(
+        [endpoints.Endpoint(flaky, weight=10), endpoints.Endpoint(good)],
+        failure_threshold=2,
+        cooldown=5.0,
+        clock=clock,
+    )
+    pool.generate("1")
+    pool.generate("2")
+    assert pool.endpoints[0].opened_at is not None
+    pool.generate("3")
+    assert flaky.calls == 2
+
+    clock.now = 10.0
+    flaky.fail = False
+    assert pool.generate("4") == "flaky:4"
+    assert pool.endpoints[0].opened_at is None
+
+
+def test_slow_endpoint_is_ejected():
+    clock = Clock()
+
+    class Slow(Backend):
+        def generate(self, messages, **kwargs):
+            clock.now += 5.0
+            return super().generate(messages, **kwargs)
+
+    slow, fast = Slow("slow"), Backend("fast")
+    pool = endpoints.EndpointPool(
+        [endpoints.Endpoint(slow, weight=10), endpoints.Endpoint(fast)],
+        failure_threshold=1,
+        slow_threshold=1.0,
+        clock=clock,
+    )
+    assert pool.generate("1") == "slow:1"
+    assert pool.generate("2") == "fast:2"
+
+
+def test_least_outstanding_respects_weight():
+    heavy, light = Backend("heavy"), Backend("light")
+    pool = endpoints.EndpointPool(
+        [endpoints.Endpoint(light), endpoints.Endpoint(heavy, weight=3)],
+    )
+    pool.endpoints[1].outstanding = 1
+    assert pool.generate("x") == "heavy:x"
+    pool.endpoints[1].outstanding = 3
+    assert pool.generate("y") == "light:y"
+
+
+def test_latency_routing_prefers_fast_endpoint():
+    slow, fast = Backend("slow"), Backend("fast")
+    pool = endpoints.EndpointPool(
+        [endpoints.Endpoint(slow), endpoints.Endpoint(fast)],
+        routing="latency",
+    )
+    pool.endpoints[0].latency = 2.0
+    pool.endpoints[1].latency = 0.5
+    assert pool.generate("x") == "fast:x"
+
+
+def test_create_agent_builds_pool(monkeypatch):
+    built = []
+
+    class DummyModel:
+        def __init__(self, **kwargs):
+            built.append(kwargs)
+
+    monkeypatch.setattr(agent, "OpenAIServerModel", DummyModel)
+    monkeypatch.setattr(agent, "CodeAgent", lambda model, **kwargs: model)
+    model = agent.create_agent(
+        api_key="k",
+        headers={"X-A": "1"},
+        endpoints=[
+            {"api_base": "http://a/v1", "weight": 2},
+            {"api_base": "http://b/v1", "api_key": "kb", "headers": {"X-B": "2"}},
+        ],
+        balancer={"routing": "latency"},
+    )
+    pool = model.model
+    assert isinstance(pool, endpoints.EndpointPool)
+    assert [e["weight"] for e in pool.status()] == [2, 1.0]
+    assert pool.routing == "latency"
+    assert [e.weight for e in pool.endpoints] == [2, 1.0]
+    assert built[0]["api_key"] == "k"
+    assert built[1]["api_key"] == "kb"
+    assert built[1]["client_kwargs"]["default_headers"] == {"X-A": "1", "X-B": "2"}
+    assert [b["client_kwargs"]["max_retries"] for b in built] == [0, 0]
+
+
+def test_session_reports_endpoint_status(monkeypatch):
+    class Holder:
+        def __init__(self, model, **kwargs):
+            self.model = model
+
+    monkeypatch.setattr(agent, "OpenAIServerModel", lambda **kwargs: Backend("x"))
+    monkeypatch.setattr(agent, "CodeAgent", Holder)
+    pooled = agent.ChatSession(endpoints=[{"api_base": "http://a/v1"}])
+    assert [e["outstanding"] for e in pooled.endpoint_status()] == [0]
+    assert agent.ChatSession().endpoint_status() == []
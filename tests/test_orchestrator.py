@@ -0,0 +1,121 @@
+import threading
+import time
+
+import pytest
+
+from yowon import agent, budget, orchestrator
+
+
+class Echo:
+    def __init__(self, name, delay=0.0, barrier=None):
+        self.name = name
+        self.delay = delay
+        self.barrier = barrier
+        self.budgets = []
+
+    def ask(self, prompt, budget=None):
+        self.budgets.append(budget)
+        if self.barrier is not None:
+            self.barrier.wait(timeout=2)
+        time.sleep(self.delay)
+        return f"{self.name}:{prompt}"
+
+
+def test_dispatch_runs_agents_concurrently():
+    barrier = threading.Barrier(2)
+    multi = agent.MultiChatSession(
+        {"a": Echo("a", barrier=barrier), "b": Echo("b", barrier=barrier)},
+    )
+    orch = orchestrator.Orchestrator(multi, max_concurrency=2)
+    assert orch.dispatch({"a": "x", "b": "y"}) == {"a": "a:x", "b": "b:y"}
+
+
+def test_concurrency_cap_limits_parallel_calls():
+    running = []
+    peak = []
+    lock = threading.Lock()
+
+    class Counting(Echo):
+        def ask(self, prompt, budget=None):
+            with lock:
+                running.append(1)
+                peak.append(len(running))
+            time.sleep(0.05)
+            with lock:
+                running.pop()
+            return prompt
+
+    multi = agent.MultiChatSession({n: Counting(n) for n in "abcd"})
+    orch = orchestrator.Orchestrator(multi, max_concurrency=2)
+    orch.dispatch({n: n for n in "abcd"})
+    assert max(peak) == 2
+
+
+def test_per_agent_timeout(monkeypatch):
+    monkeypatch.setattr(orchestrator, "RESULT_GRACE", 0.0)
+    multi = agent.MultiChatSession({"slow": Echo("slow", delay=0.5), "fast": Echo("fast")})
+    orch = orchestrator.Orchestrator(multi, timeouts={"slow": 0.05})
+    answers = orch.dispatch({"slow": "x", "fast": "y"})
+    assert answers["fast"] == "fast:y"
+    assert "timed out" in answers["slow"]
+    assert multi.sessions["slow"].budgets[0].timeout == 0.05
+    assert multi.sessions["fast"].budgets == [None]
+
+
+def test_sub_agents_inherit_caller_deadline():
+    multi = agent.MultiChatSession({"a": Echo("a")})
+    orch = orchestrator.Orchestrator(multi, timeout=60)
+    with budget.Budget(timeout=5).active():
+        orch.ask("a", "x")
+    assert multi.sessions["a"].budgets[0].timeout <= 5
+
+
+def test_tools_expose_agents_by_role():
+    multi = agent.MultiChatSession(
+        {"o3-cold": Echo("o3"), "py": Echo("py")},
+        roles={"o3-cold": "Careful reasoning"},
+    )
+    tools = orchestrator.Orchestrator(multi).tools()
+    by_name = {tool.name: tool for tool in tools}
+    assert set(by_name) == {"o3_cold", "py", "dispatch"}
+    assert "Careful reasoning" in by_name["o3_cold"].description
+    assert by_name["o3_cold"](prompt="hi") == "o3:hi"
+    assert by_name["dispatch"]({"o3_cold": "a", "py": "b"}) == {
+        "o3-cold": "o3:a",
+        "py": "py:b",
+    }
+
+
+def test_create_orchestrator_reads_config(monkeypatch):
+    monkeypatch.setattr(agent, "ChatSession", lambda **kwargs: Echo("llm"))
+    config = {
+        "orchestrator": {"max_concurrency": 3, "timeout": 9},
+        "agents": {"llm": {"model": "m", "timeout": 2}, "sh": {"type": "shell"}},
+    }
+    orch = orchestrator.create_orchestrator(config)
+    assert orch.timeout == 9
+    assert orch.timeouts == {"llm": 2}
+    assert orch.ask("sh", "echo hi") == "hi"
+
+
+def test_create_agent_passes_tools(monkeypatch):
+    captured = {}
+
+    def dummy_agent(**kwargs):
+        captured.update(kwargs)
+
+    monkeypatch.setattr(agent, "OpenAIServerModel", lambda **kwargs: None)
+    monkeypatch.setattr(agent, "CodeAgent", dummy_agent)
+    multi = agent.MultiChatSession({"a": Echo("a")})
+    tools = orchestrator.Orchestrator(multi).tools()
+    agent.create_agent(tools=tools)
+    assert captured["tools"] == tools
+
+
+def test_tools_reject_colliding_agent_names():
+    clash = agent.MultiChatSession({"o3-cold": Echo("a"), "o3_cold": Echo("b")})
+    with pytest.raises(ValueError, match="'o3-cold' and 'o3_cold'"):
+        orchestrator.Orchestrator(clash).tools()
+    reserved = agent.MultiChatSession({"dispatch": Echo("d")})
+    with pytest.raises(ValueError, match="built-in 'dispatch'"):
+        orchestrator.Orchestrator(reserved).tools()
@@ -0,0 +1,136 @@
+import threading
+import time
+
+import anyio
+import pytest
+
+from yowon import server, singleflight
+
+
+class SlowSession:
+    def __init__(self):
+        self.calls = []
+        self.release = threading.Event()
+
+    def ask(self, prompt, budget=None):
+        self.calls.append(prompt)
+        self.budget = budget
+        self.release.wait(timeout=2)
+        return f"echo:{prompt}"
+
+    def memory_usage(self):
+        return {"steps": len(self.calls)}
+
+    def fork(self):
+        self.forks = getattr(self, "forks", 0) + 1
+        return self
+
+
+def test_single_flight_shares_running_call():
+    flight = singleflight.SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def work():
+        calls.append(1)
+        started.set()
+        release.wait(timeout=2)
+        return "done"
+
+    results = []
+    leader = threading.Thread(target=lambda: results.append(flight.do("k", work)))
+    leader.start()
+    started.wait(timeout=2)
+    follower = threading.Thread(target=lambda: results.append(flight.do("k", work)))
+    follower.start()
+    while flight.stats()["coalesced"] == 0:
+        time.sleep(0.01)
+    release.set()
+    leader.join()
+    follower.join()
+    assert results == ["done", "done"]
+    assert calls == [1]
+    assert flight.stats() == {"calls": 2, "coalesced": 1, "in_flight": 0}
+
+
+def test_single_flight_does_not_cache_finished_calls():
+    flight = singleflight.SingleFlight()
+    assert flight.do("k", lambda: "a") == "a"
+    assert flight.do("k", lambda: "b") == "b"
+    assert flight.coalesced == 0
+
+
+def test_single_flight_propagates_errors():
+    flight = singleflight.SingleFlight()
+
+    def boom():
+        raise ValueError("bad")
+
+    with pytest.raises(ValueError, match="bad"):
+        flight.do("k", boom)
+    assert flight.stats()["in_flight"] == 0
+
+
+def test_flight_key_depends_on_settings_and_prompt():
+    key = singleflight.flight_key({"model": "a", "top_p": 1}, "hi")
+    assert key == singleflight.flight_key({"top_p": 1, "model": "a"}, "hi")
+    assert key != singleflight.flight_key({"model": "b", "top_p": 1}, "hi")
+    assert key != singleflight.flight_key({"model": "a", "top_p": 1}, "hello")
+
+
+def test_chat_coalesces_identical_stateless_prompts(monkeypatch):
+    fake = SlowSession()
+    monkeypatch.setattr(server, "session", fake)
+    monkeypatch.setattr(server, "flights", singleflight.SingleFlight())
+    results = []
+
+    async def ask():
+        results.append(await server.chat("hi", stateless=True))
+
+    async def release():
+        while server.flights.stats()["coalesced"] < 2:
+            await anyio.sleep(0.01)
+        fake.release.set()
+
+    async def run():
+        async with anyio.create_task_group() as tg:
+            for _ in range(3):
+                tg.start_soon(ask)
+            tg.start_soon(release)
+
+    anyio.run(run)
+    assert results == ["echo:hi"] * 3
+    assert fake.calls == ["hi"]
+    assert fake.forks == 1
+    assert server.coalescing() == {"calls": 3, "coalesced": 2, "in_flight": 0}
+
+
+def test_chat_runs_every_conversation_turn(monkeypatch):
+    fake = SlowSession()
+    fake.release.set()
+    monkeypatch.setattr(server, "session", fake)
+    monkeypatch.setattr(server, "flights", singleflight.SingleFlight())
+
+    async def run():
+        async with anyio.create_task_group() as tg:
+            for _ in range(2):
+                tg.start_soon(server.chat, "hi")
+
+    anyio.run(run)
+    assert fake.calls == ["hi", "hi"]
+    assert not hasattr(fake, "forks")
+    assert server.coalescing()["calls"] == 0
+
+
+def test_chat_passes_budget(monkeypatch):
+    fake = SlowSession()
+    fake.release.set()
+    monkeypatch.setattr(server, "session", fake)
+    result = anyio.run(
+        lambda: server.chat("hi", timeout=30, max_steps=2, token_budget=500),
+    )
+    assert result == "echo:hi"
+    assert fake.budget.timeout == 30
+    assert fake.budget.max_steps == 2
+    assert fake.budget.max_tokens == 500
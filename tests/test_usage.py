@@ -0,0 +1,77 @@
+from types import SimpleNamespace
+
+from smolagents import Tool
+from smolagents.models import ChatMessage, TokenUsage
+
+from yowon import agent, cassette, usage
+
+ANSWER = "Thought: done\nCode:\n```py\nfinal_answer('ok')\n```<end_code>"
+
+
+def openai_raw(cached):
+    details = SimpleNamespace(cached_tokens=cached)
+    return SimpleNamespace(usage=SimpleNamespace(prompt_tokens_details=details))
+
+
+class CachingModel:
+    model_id = "fake"
+
+    def generate(self, messages, **kwargs):
+        return ChatMessage(
+            role="assistant",
+            content=ANSWER,
+            raw=openai_raw(80),
+            token_usage=TokenUsage(input_tokens=100, output_tokens=5),
+        )
+
+
+class NamedTool(Tool):
+    inputs = {"x": {"type": "string", "description": "Input."}}
+    output_type = "string"
+
+    def __init__(self, name):
+        self.name = name
+        self.description = f"Tool {name}."
+        super().__init__()
+
+    def forward(self, x):
+        return x
+
+
+def test_cached_tokens_from_raw_response():
+    assert usage.cached_tokens(ChatMessage(role="assistant", raw=openai_raw(12))) == 12
+    raw = {"usage": {"cached_tokens": 3}}
+    assert usage.cached_tokens(ChatMessage(role="assistant", raw=raw)) == 3
+    assert usage.cached_tokens(ChatMessage(role="assistant")) == 0
+
+
+def test_session_reports_cache_hits(monkeypatch):
+    monkeypatch.setattr(agent, "create_model", lambda **kwargs: CachingModel())
+    session = agent.ChatSession()
+    session.ask("one")
+    session.ask("two")
+    stats = session.stats()
+    assert stats["last_turn"] == {
+        "steps": 1,
+        "input_tokens": 100,
+        "output_tokens": 5,
+        "cached_tokens": 80,
+        "cache_hit_ratio": 0.8,
+    }
+    assert stats["total"]["steps"] == 2
+    assert stats["total"]["input_tokens"] == 200
+    assert stats["total"]["cache_hit_ratio"] == 0.8
+
+
+def test_system_prompt_does_not_depend_on_tool_order():
+    a, b = NamedTool("alpha"), NamedTool("beta")
+    first = agent.create_agent(api_key="x", tools=[a, b])
+    second = agent.create_agent(api_key="x", tools=[b, a])
+    assert first.initialize_system_prompt() == second.initialize_system_prompt()
+
+
+def test_cassette_keeps_cached_tokens(tmp_path):
+    recorder = cassette.RecordingModel(CachingModel(), tmp_path)
+    recorder.generate([])
+    replayed = cassette.ReplayModel(tmp_path, model_id="fake").generate([])
+    assert usage.cached_tokens(replayed) == 80
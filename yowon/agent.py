@@ -1,12 +1,21 @@
 from __future__ import annotations
 
 import importlib.resources
+import json
 import os
 import subprocess
 import sys
+import uuid
+from pathlib import Path
+from typing import Any
 
 import yaml
-from smolagents import CodeAgent, OpenAIServerModel
+from smolagents import CodeAgent, OpenAIServerModel, Tool
+
+from .budget import Budget, BudgetedModel
+from .cassette import RecordingModel, ReplayModel
+from .endpoints import Endpoint, EndpointPool
+from .usage import turn_stats
 
 DEFAULT_MODEL = "codex-mini-latest"
 
@@ -15,6 +24,21 @@ PROMPT_PATH = importlib.resources.files("smolagents.prompts").joinpath(
 )
 BASE_PROMPTS: dict[str, str] = yaml.safe_load(PROMPT_PATH.read_text())
 
+SPILL_DIR = Path.home() / ".yowon" / "spill"
+
+DEFAULT_SUBPROCESS_TIMEOUT = 10.0
+
+
+def dump_step(step: object) -> str:
+    """Serialize a memory step to JSON, stringifying unknown values."""
+    data = step.dict() if hasattr(step, "dict") else vars(step)
+    return json.dumps(data, default=str)
+
+
+def step_size(step: object) -> int:
+    """Return the approximate size in bytes of a memory step."""
+    return len(dump_step(step).encode())
+
 
 class ChatSession:
     """Keep conversation state across multiple agent runs."""
@@ -30,6 +54,19 @@ class ChatSession:
         wire: str | None = None,
         top_p: float | None = None,
         max_tokens: int | None = None,
+        memory_soft_limit: int | None = None,
+        memory_hard_limit: int | None = None,
+        spill_dir: Path | None = None,
+        endpoints: list[dict[str, Any]] | None = None,
+        balancer: dict[str, Any] | None = None,
+        tools: list[Tool] | None = None,
+        record: Path | None = None,
+        replay: Path | None = None,
+        replay_speed: float = 0.0,
+        timeout: float | None = None,
+        max_steps: int | None = None,
+        token_budget: int | None = None,
+        model: Any | None = None,
     ) -> None:
         self._agent = create_agent(
             model_id=model_id,
@@ -41,17 +78,155 @@ class ChatSession:
             wire=wire,
             top_p=top_p,
             max_tokens=max_tokens,
+            endpoints=endpoints,
+            balancer=balancer,
+            tools=tools,
+            record=record,
+            replay=replay,
+            replay_speed=replay_speed,
+            model=model,
         )
+        self._tools = tools
         self._reset = True
+        self.memory_soft_limit = memory_soft_limit
+        self.memory_hard_limit = memory_hard_limit
+        self.spill_dir = spill_dir or SPILL_DIR
+        self.session_id = uuid.uuid4().hex
+        self.spilled_steps = 0
+        self.evictions = 0
+        # Finished steps do not change, so their size is computed only once.
+        self._step_sizes: dict[int, tuple[object, int]] = {}
+        self.limits = Budget(timeout, max_steps, token_budget)
+        self.last_turn = turn_stats([])
+        self.totals = turn_stats([])
 
-    def ask(self, prompt: str) -> str:
-        result = self._agent.run(prompt, reset=self._reset)
+    def ask(self, prompt: str, budget: Budget | None = None) -> str:
+        """Answer ``prompt`` within the session limits and the given ``budget``.
+
+        When the time or token budget runs out mid-run, the best partial answer
+        from the agent memory is returned instead of raising.
+        """
+        budget = self.limits.tighten(budget)
+        run_kwargs = {"max_steps": budget.max_steps} if budget.max_steps else {}
+        first_step = 0 if self._reset else len(self._memory_steps())
+        with budget.active():
+            try:
+                result = self._agent.run(prompt, reset=self._reset, **run_kwargs)
+            except Exception:
+                if not budget.expired():
+                    raise
+                result = self._partial_answer(first_step)
         self._reset = False
+        self._record_stats(self._memory_steps()[first_step:])
+        self._enforce_memory_limits()
         return result
 
+    def stats(self) -> dict[str, dict[str, float]]:
+        """Return token usage and prompt cache hits for the last turn and overall."""
+        return {"last_turn": dict(self.last_turn), "total": dict(self.totals)}
+
+    def _record_stats(self, steps: list[object]) -> None:
+        self.last_turn = turn_stats(steps)
+        for key in ("steps", "input_tokens", "output_tokens", "cached_tokens"):
+            self.totals[key] += self.last_turn[key]
+        input_tokens = self.totals["input_tokens"]
+        self.totals["cache_hit_ratio"] = (
+            self.totals["cached_tokens"] / input_tokens if input_tokens else 0.0
+        )
+
     def reset(self) -> None:
         self._reset = True
 
+    def fork(self) -> ChatSession:
+        """Return a session with empty memory sharing this model, tools and limits."""
+        return ChatSession(
+            tools=self._tools,
+            timeout=self.limits.timeout,
+            max_steps=self.limits.max_steps,
+            token_budget=self.limits.max_tokens,
+            model=self._agent.model,
+        )
+
+    def endpoint_status(self) -> list[dict[str, object]]:
+        """Return load and circuit state per endpoint when several are configured."""
+        model = getattr(self._agent, "model", None)
+        while model is not None and not isinstance(model, EndpointPool):
+            model = getattr(model, "model", None)
+        return model.status() if model is not None else []
+
+    def memory_usage(self) -> dict[str, int]:
+        """Return step count and approximate byte size of the agent memory."""
+        steps = self._memory_steps()
+        return {
+            "steps": len(steps),
+            "bytes": sum(self._sizes(steps)),
+            "spilled_steps": self.spilled_steps,
+            "evictions": self.evictions,
+        }
+
+    def evict(self) -> None:
+        """Drop the agent memory and start over on the next prompt."""
+        self._memory_steps().clear()
+        self._step_sizes = {}
+        self._reset = True
+        self.evictions += 1
+
+    def _partial_answer(self, first_step: int) -> str:
+        """Return the latest output produced by the current run."""
+        for step in reversed(self._memory_steps()[first_step:]):
+            for attr in ("action_output", "observations", "model_output"):
+                value = getattr(step, attr, None)
+                if value:
+                    return str(value)
+        return "No answer before the budget ran out."
+
+    def _memory_steps(self) -> list[object]:
+        memory = getattr(self._agent, "memory", None)
+        return getattr(memory, "steps", [])
+
+    def _sizes(self, steps: list[object]) -> list[int]:
+        """Return the size of each step, reusing sizes computed earlier."""
+        known = self._step_sizes
+        current: dict[int, tuple[object, int]] = {}
+        for step in steps:
+            entry = known.get(id(step))
+            if entry is None or entry[0] is not step:
+                entry = (step, step_size(step))
+            current[id(step)] = entry
+        self._step_sizes = current
+        return [current[id(step)][1] for step in steps]
+
+    def _enforce_memory_limits(self) -> None:
+        if self.memory_soft_limit is None and self.memory_hard_limit is None:
+            return
+        steps = self._memory_steps()
+        sizes = self._sizes(steps)
+        total = sum(sizes)
+        if self.memory_soft_limit is not None and total > self.memory_soft_limit:
+            total = self._spill(steps, sizes, total, self.memory_soft_limit)
+        if self.memory_hard_limit is not None and total > self.memory_hard_limit:
+            self.evict()
+
+    def _spill(
+        self,
+        steps: list[object],
+        sizes: list[int],
+        total: int,
+        limit: int,
+    ) -> int:
+        """Move the oldest steps to disk until ``total`` fits under ``limit``."""
+        self.spill_dir.mkdir(parents=True, exist_ok=True)
+        path = self.spill_dir / f"{self.session_id}.jsonl"
+        with path.open("a", encoding="utf-8") as fh:
+            while len(steps) > 1 and total > limit:
+                step = steps.pop(0)
+                # Drop the cached size too, or it would keep the step in memory.
+                self._step_sizes.pop(id(step), None)
+                fh.write(dump_step(step) + "\n")
+                total -= sizes.pop(0)
+                self.spilled_steps += 1
+        return total
+
 
 def create_agent(  # noqa: PLR0913
     model_id: str = DEFAULT_MODEL,
@@ -63,10 +238,63 @@ def create_agent(  # noqa: PLR0913
     wire: str | None = None,
     top_p: float | None = None,
     max_tokens: int | None = None,
+    endpoints: list[dict[str, Any]] | None = None,
+    balancer: dict[str, Any] | None = None,
+    tools: list[Tool] | None = None,
+    record: Path | None = None,
+    replay: Path | None = None,
+    replay_speed: float = 0.0,
+    model: Any | None = None,
 ) -> CodeAgent:
-    """Return a `CodeAgent` using the OpenAI model."""
+    """Return a `CodeAgent` using the OpenAI model.
+
+    When ``endpoints`` is given, calls are spread over one model per entry
+    through an `EndpointPool` configured by ``balancer``. ``record`` saves every
+    model response to a cassette directory and ``replay`` answers from one
+    instead of calling the model. Passing the ``model`` of another agent reuses
+    it as is and ignores the model settings.
+    """
+    if model is None:
+        if replay is not None:
+            model = ReplayModel(replay, model_id=model_id, speed=replay_speed)
+        else:
+            model = create_model(
+                model_id=model_id,
+                api_key=api_key,
+                api_base=api_base,
+                headers=headers,
+                temperature=temperature,
+                reasoning_effort=reasoning_effort,
+                wire=wire,
+                top_p=top_p,
+                max_tokens=max_tokens,
+                endpoints=endpoints,
+                balancer=balancer,
+            )
+        if record is not None:
+            model = RecordingModel(model, record)
+        model = BudgetedModel(model)
+    # Tools are rendered into the system prompt; a fixed order keeps the request
+    # prefix byte-identical across turns and sessions so providers can cache it.
+    tools = sorted(tools or [], key=lambda tool: tool.name)
+    return CodeAgent(model=model, tools=tools, prompt_templates=BASE_PROMPTS)
+
+
+def create_model(  # noqa: PLR0913
+    model_id: str = DEFAULT_MODEL,
+    api_key: str | None = None,
+    api_base: str | None = None,
+    headers: dict[str, str] | None = None,
+    temperature: float | None = None,
+    reasoning_effort: str | None = None,
+    wire: str | None = None,
+    top_p: float | None = None,
+    max_tokens: int | None = None,
+    endpoints: list[dict[str, Any]] | None = None,
+    balancer: dict[str, Any] | None = None,
+) -> OpenAIServerModel | EndpointPool:
+    """Return the OpenAI model, or a pool of them when ``endpoints`` is given."""
     api_key = api_key or os.getenv("OPENAI_API_KEY")
-    client_kwargs = {"default_headers": headers} if headers else None
     model_kwargs = {}
     if temperature is not None:
         model_kwargs["temperature"] = temperature
@@ -80,14 +308,33 @@ def create_agent(  # noqa: PLR0913
     elif wire is not None:
         model_kwargs["wire"] = wire
 
-    model = OpenAIServerModel(
-        model_id=model_id,
-        api_key=api_key,
-        api_base=api_base,
-        client_kwargs=client_kwargs,
-        **model_kwargs,
-    )
-    return CodeAgent(model=model, tools=[], prompt_templates=BASE_PROMPTS)
+    if not endpoints:
+        return OpenAIServerModel(
+            model_id=model_id,
+            api_key=api_key,
+            api_base=api_base,
+            # The SDK would retry a timed-out call with the full timeout again and
+            # overrun the budget deadline; budgets and pools handle retries.
+            client_kwargs={"max_retries": 0}
+            | ({"default_headers": headers} if headers else {}),
+            **model_kwargs,
+        )
+
+    pool: list[Endpoint] = []
+    for opts in endpoints:
+        endpoint_headers = {**(headers or {}), **opts.get("headers", {})}
+        endpoint_model = OpenAIServerModel(
+            model_id=opts.get("model", model_id),
+            api_key=opts.get("api_key", api_key),
+            api_base=opts.get("api_base", api_base),
+            # Let the pool fail over on the first error instead of the SDK
+            # retrying the same endpoint.
+            client_kwargs={"max_retries": 0}
+            | ({"default_headers": endpoint_headers} if endpoint_headers else {}),
+            **model_kwargs,
+        )
+        pool.append(Endpoint(endpoint_model, weight=opts.get("weight", 1.0)))
+    return EndpointPool(pool, **(balancer or {}))
 
 
 class MultiChatSession:
@@ -101,10 +348,10 @@ class MultiChatSession:
         self.sessions = sessions
         self.roles = roles or {}
 
-    def ask(self, prompt: str, target: str) -> str:
+    def ask(self, prompt: str, target: str, budget: Budget | None = None) -> str:
         if target not in self.sessions:
             raise KeyError(target)
-        return self.sessions[target].ask(prompt)
+        return self.sessions[target].ask(prompt, budget)
 
     def options(self) -> list[str]:
         return list(self.sessions)
@@ -112,23 +359,58 @@ class MultiChatSession:
     def get_role(self, name: str) -> str | None:
         return self.roles.get(name)
 
+    def memory_usage(self) -> dict[str, dict[str, int]]:
+        """Return memory accounting for every chat session by name."""
+        return {
+            name: session.memory_usage()
+            for name, session in self.sessions.items()
+            if isinstance(session, ChatSession)
+        }
+
+
+def memory_report(
+    session: ChatSession,
+    multi: MultiChatSession | None = None,
+) -> dict[str, Any]:
+    """Return memory accounting for ``session`` and its sub-agent sessions."""
+    return {
+        "session": session.memory_usage(),
+        "agents": multi.memory_usage() if multi else {},
+    }
+
+
+def subprocess_timeout(timeout: float, budget: Budget | None) -> float:
+    remaining = budget.remaining() if budget is not None else None
+    return timeout if remaining is None else min(timeout, remaining)
+
+
+def partial_output(exc: subprocess.TimeoutExpired) -> str:
+    """Return whatever a timed-out subprocess printed, or the error itself."""
+    output = exc.stdout or exc.stderr or b""
+    if isinstance(output, bytes):
+        output = output.decode(errors="replace")
+    return output.strip() or str(exc)
+
 
 class PythonAgent:
     """Execute Python snippets and return their output."""
 
-    def __init__(self) -> None:
+    def __init__(self, timeout: float = DEFAULT_SUBPROCESS_TIMEOUT) -> None:
         self._globals: dict[str, object] = {}
+        self.timeout = timeout
 
-    def ask(self, prompt: str) -> str:
+    def ask(self, prompt: str, budget: Budget | None = None) -> str:
         try:
             result = subprocess.run(  # noqa: S603
                 [sys.executable, "-c", prompt],
                 capture_output=True,
                 text=True,
-                timeout=10,
+                timeout=subprocess_timeout(self.timeout, budget),
                 check=False,
             )
             return result.stdout.strip() or result.stderr.strip()
+        except subprocess.TimeoutExpired as exc:
+            return partial_output(exc)
         except Exception as exc:  # noqa: BLE001 pragma: no cover - subprocess errors
             return str(exc)
 
@@ -136,29 +418,41 @@ class PythonAgent:
 class ShellAgent:
     """Execute shell commands and return their output."""
 
-    def ask(self, prompt: str) -> str:
+    def __init__(self, timeout: float = DEFAULT_SUBPROCESS_TIMEOUT) -> None:
+        self.timeout = timeout
+
+    def ask(self, prompt: str, budget: Budget | None = None) -> str:
         try:
             result = subprocess.run(  # noqa: S602
                 prompt,
                 shell=True,
                 capture_output=True,
                 text=True,
-                timeout=10,
+                timeout=subprocess_timeout(self.timeout, budget),
                 check=False,
             )
             return result.stdout.strip() or result.stderr.strip()
+        except subprocess.TimeoutExpired as exc:
+            return partial_output(exc)
         except Exception as exc:  # noqa: BLE001 pragma: no cover - subprocess errors
             return str(exc)
 
 
-def create_multi_session(
+def create_multi_session(  # noqa: PLR0913
     config: dict[str, object],
     *,
     api_key: str | None = None,
     api_base: str | None = None,
     headers: dict[str, str] | None = None,
+    record: Path | None = None,
+    replay: Path | None = None,
+    replay_speed: float = 0.0,
 ) -> MultiChatSession:
-    """Build a ``MultiChatSession`` from configuration."""
+    """Build a ``MultiChatSession`` from configuration.
+
+    With ``record`` or ``replay`` every chat agent uses its own cassette in
+    ``<dir>/agents/<name>``.
+    """
 
     agents = config.get("agents", {})
     sessions: dict[str, ChatSession | PythonAgent | ShellAgent] = {}
@@ -166,12 +460,16 @@ def create_multi_session(
     for name, opts in agents.items():
         agent_type = opts.get("type", "openai")
         if agent_type == "python":
-            sessions[name] = PythonAgent()
+            sessions[name] = PythonAgent(
+                timeout=opts.get("timeout", DEFAULT_SUBPROCESS_TIMEOUT),
+            )
             if "role" in opts:
                 roles[name] = opts["role"]
             continue
         if agent_type == "shell":
-            sessions[name] = ShellAgent()
+            sessions[name] = ShellAgent(
+                timeout=opts.get("timeout", DEFAULT_SUBPROCESS_TIMEOUT),
+            )
             if "role" in opts:
                 roles[name] = opts["role"]
             continue
@@ -185,6 +483,16 @@ def create_multi_session(
             wire=opts.get("wire"),
             top_p=opts.get("top_p"),
             max_tokens=opts.get("max_tokens"),
+            memory_soft_limit=opts.get("memory_soft_limit"),
+            memory_hard_limit=opts.get("memory_hard_limit"),
+            endpoints=opts.get("endpoints"),
+            balancer=opts.get("balancer", config.get("balancer")),
+            record=record / "agents" / name if record else None,
+            replay=replay / "agents" / name if replay else None,
+            replay_speed=replay_speed,
+            timeout=opts.get("timeout"),
+            max_steps=opts.get("max_steps"),
+            token_budget=opts.get("token_budget"),
         )
         if "role" in opts:
             roles[name] = opts["role"]
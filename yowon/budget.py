@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterator
+
+_current: ContextVar[Budget | None] = ContextVar("yowon_budget", default=None)
+
+
+def _smallest(*values: float | None) -> float | None:
+    present = [value for value in values if value is not None]
+    return min(present) if present else None
+
+
+class BudgetExceededError(RuntimeError):
+    """Raised before a model call once the active budget is used up."""
+
+
+class Budget:
+    """Wall-clock, step and token limits for answering one prompt.
+
+    The clock starts on the first ``start()`` call. Every limit is optional;
+    a budget without limits never expires. A budget with a ``parent`` also runs
+    out with it and charges its tokens to it as well.
+    """
+
+    def __init__(
+        self,
+        timeout: float | None = None,
+        max_steps: int | None = None,
+        max_tokens: int | None = None,
+        clock: Callable[[], float] = time.monotonic,
+        parent: Budget | None = None,
+    ) -> None:
+        self.timeout = timeout
+        self.max_steps = max_steps
+        self.max_tokens = max_tokens
+        self.parent = parent
+        self.tokens_used = 0
+        self._clock = clock
+        self._started: float | None = None
+        self._lock = threading.Lock()
+
+    def start(self) -> Budget:
+        if self._started is None:
+            self._started = self._clock()
+        return self
+
+    def remaining(self) -> float | None:
+        """Return the seconds left, or ``None`` without a wall-clock limit."""
+        own = None
+        if self.timeout is not None:
+            elapsed = 0.0 if self._started is None else self._clock() - self._started
+            own = max(self.timeout - elapsed, 0.0)
+        if self.parent is None:
+            return own
+        return _smallest(own, self.parent.remaining())
+
+    def remaining_tokens(self) -> int | None:
+        own = None
+        if self.max_tokens is not None:
+            own = max(self.max_tokens - self.tokens_used, 0)
+        if self.parent is None:
+            return own
+        remaining = _smallest(own, self.parent.remaining_tokens())
+        return None if remaining is None else int(remaining)
+
+    def charge(self, tokens: int) -> None:
+        # Sub-agents running in parallel charge the same parent.
+        with self._lock:
+            self.tokens_used += tokens
+        if self.parent is not None:
+            self.parent.charge(tokens)
+
+    def expired(self) -> bool:
+        return self.remaining() == 0 or self.remaining_tokens() == 0
+
+    def tighten(self, other: Budget | None) -> Budget:
+        """Return a fresh budget that runs out no later than ``other``.
+
+        Tokens charged to the new budget are charged to ``other`` as well.
+        """
+        if other is None:
+            return Budget(self.timeout, self.max_steps, self.max_tokens, self._clock)
+        max_steps = _smallest(self.max_steps, other.max_steps)
+        max_tokens = _smallest(self.max_tokens, other.remaining_tokens())
+        return Budget(
+            timeout=_smallest(self.timeout, other.remaining()),
+            max_steps=None if max_steps is None else int(max_steps),
+            max_tokens=None if max_tokens is None else int(max_tokens),
+            clock=self._clock,
+            parent=other,
+        )
+
+    @contextmanager
+    def active(self) -> Iterator[Budget]:
+        """Make this budget the one model calls in this context are charged to."""
+        token = _current.set(self.start())
+        try:
+            yield self
+        finally:
+            _current.reset(token)
+
+
+def current_budget() -> Budget | None:
+    return _current.get()
+
+
+class BudgetedModel:
+    """Apply the active budget to every call of ``model``.
+
+    Calls fail fast once the budget is spent, the remaining time is passed on
+    as the request ``timeout`` and the tokens of each response are charged.
+    """
+
+    def __init__(self, model: Any) -> None:
+        self.model = model
+
+    def __getattr__(self, name: str) -> Any:
+        if name == "model":
+            raise AttributeError(name)
+        return getattr(self.model, name)
+
+    def __call__(self, *args: Any, **kwargs: Any) -> Any:
+        return self.generate(*args, **kwargs)
+
+    def generate(self, *args: Any, **kwargs: Any) -> Any:
+        budget = current_budget()
+        if budget is None:
+            return self.model.generate(*args, **kwargs)
+        if budget.expired():
+            msg = "Budget exhausted before the next model call"
+            raise BudgetExceededError(msg)
+        remaining = budget.remaining()
+        if remaining is not None:
+            kwargs.setdefault("timeout", remaining)
+        message = self.model.generate(*args, **kwargs)
+        usage = getattr(message, "token_usage", None)
+        if usage is not None:
+            budget.charge(usage.input_tokens + usage.output_tokens)
+        return message
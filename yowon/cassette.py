@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+import json
+import threading
+import time
+from collections import deque
+from typing import TYPE_CHECKING, Any
+
+from smolagents.models import ChatMessage, TokenUsage
+
+from .singleflight import flight_key
+from .usage import cached_tokens
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+INDEX_FILE = "index.jsonl"
+BODIES_FILE = "bodies.jsonl"
+
+# Per-call transport options that do not change the model's answer.
+IGNORED_KWARGS = frozenset({"timeout"})
+
+
+def request_key(model_id: str | None, *args: Any, **kwargs: Any) -> str:
+    """Return the cassette key for a ``generate`` call."""
+    kwargs = {k: v for k, v in kwargs.items() if k not in IGNORED_KWARGS}
+    tools = kwargs.pop("tools_to_call_from", None)
+    if tools:
+        kwargs["tools_to_call_from"] = sorted(tool.name for tool in tools)
+    return flight_key(model_id, args, kwargs)
+
+
+def encode_message(message: ChatMessage) -> dict[str, Any]:
+    data = json.loads(message.model_dump_json())
+    cached = cached_tokens(message)
+    if cached:
+        data["cached_tokens"] = cached
+    return data
+
+
+def decode_message(data: dict[str, Any]) -> ChatMessage:
+    usage = data.get("token_usage")
+    cached = data.get("cached_tokens")
+    return ChatMessage.from_dict(
+        data,
+        # Only the cache hit count of the raw provider response is kept.
+        raw={"usage": {"cached_tokens": cached}} if cached else None,
+        token_usage=TokenUsage(
+            input_tokens=usage["input_tokens"],
+            output_tokens=usage["output_tokens"],
+        )
+        if usage
+        else None,
+    )
+
+
+class Cassette:
+    """Model responses stored in a directory, indexed by request key.
+
+    ``bodies.jsonl`` holds one response per line and ``index.jsonl`` maps each
+    request key to the byte range of its response and the original latency, so
+    replay only parses the responses it actually serves.
+    """
+
+    def __init__(self, directory: Path) -> None:
+        self.directory = directory
+        self.index_path = directory / INDEX_FILE
+        self.bodies_path = directory / BODIES_FILE
+        self._lock = threading.Lock()
+
+    def append(self, key: str, latency: float, message: ChatMessage) -> None:
+        body = (json.dumps(encode_message(message)) + "\n").encode()
+        with self._lock:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            with self.bodies_path.open("ab") as fh:
+                offset = fh.tell()
+                fh.write(body)
+            entry = {
+                "key": key,
+                "offset": offset,
+                "length": len(body),
+                "latency": round(latency, 6),
+            }
+            with self.index_path.open("a", encoding="utf-8") as fh:
+                fh.write(json.dumps(entry) + "\n")
+
+    def load_index(self) -> dict[str, deque[tuple[int, int, float]]]:
+        """Return the recorded ``(offset, length, latency)`` entries per key."""
+        index: dict[str, deque[tuple[int, int, float]]] = {}
+        with self.index_path.open(encoding="utf-8") as fh:
+            for line in fh:
+                entry = json.loads(line)
+                index.setdefault(entry["key"], deque()).append(
+                    (entry["offset"], entry["length"], entry["latency"]),
+                )
+        return index
+
+    def read(self, offset: int, length: int) -> ChatMessage:
+        with self.bodies_path.open("rb") as fh:
+            fh.seek(offset)
+            return decode_message(json.loads(fh.read(length)))
+
+
+class RecordingModel:
+    """Forward calls to ``model`` and record each response with its latency."""
+
+    def __init__(self, model: Any, directory: Path) -> None:
+        self.model = model
+        self.cassette = Cassette(directory)
+
+    def __getattr__(self, name: str) -> Any:
+        if name == "model":
+            raise AttributeError(name)
+        return getattr(self.model, name)
+
+    def __call__(self, *args: Any, **kwargs: Any) -> ChatMessage:
+        return self.generate(*args, **kwargs)
+
+    def generate(self, *args: Any, **kwargs: Any) -> ChatMessage:
+        start = time.perf_counter()
+        message = self.model.generate(*args, **kwargs)
+        latency = time.perf_counter() - start
+        key = request_key(self.model.model_id, *args, **kwargs)
+        self.cassette.append(key, latency, message)
+        return message
+
+
+class ReplayModel:
+    """Serve recorded responses without calling the model.
+
+    ``speed`` scales the recorded latencies: ``1`` replays in real time, ``10``
+    ten times faster and ``0`` without any delay. Identical requests are
+    answered in the order they were recorded.
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        model_id: str | None = None,
+        speed: float = 0.0,
+    ) -> None:
+        if speed < 0:
+            msg = f"Replay speed must not be negative, got {speed}"
+            raise ValueError(msg)
+        self.model_id = model_id
+        self.speed = speed
+        self.cassette = Cassette(directory)
+        self._index = self.cassette.load_index()
+        self._lock = threading.Lock()
+
+    def __call__(self, *args: Any, **kwargs: Any) -> ChatMessage:
+        return self.generate(*args, **kwargs)
+
+    def generate(self, *args: Any, **kwargs: Any) -> ChatMessage:
+        key = request_key(self.model_id, *args, **kwargs)
+        with self._lock:
+            entries = self._index.get(key)
+            if not entries:
+                msg = f"No recorded response left for request {key[:12]}"
+                raise LookupError(msg)
+            offset, length, latency = entries.popleft()
+        if self.speed:
+            time.sleep(latency / self.speed)
+        return self.cassette.read(offset, length)
@@ -7,7 +7,8 @@ import anyio
 import typer
 from typer import BadParameter
 
-from yowon.agent import DEFAULT_MODEL, ChatSession, create_agent
+from yowon.agent import DEFAULT_MODEL, ChatSession, MultiChatSession, memory_report
+from yowon.orchestrator import create_orchestrator
 from yowon.server import main as server_main
 from yowon.tui import main as tui_main
 
@@ -34,6 +35,12 @@ def parse_headers(values: list[str]) -> dict[str, str]:
     return headers
 
 
+def spill_path(value: object | None) -> Path | None:
+    if value is None:
+        return None
+    return Path(str(value)).expanduser()
+
+
 def apply_config(
         ctx: typer.Context,
         value: object | None,
@@ -81,6 +88,36 @@ def run(  # noqa: PLR0913
         wire: str | None = typer.Option(None, "--wire", help="Wire mode"),
         top_p: float | None = typer.Option(None, "--top-p", help="Nucleus sampling"),
         max_tokens: int | None = typer.Option(None, "--max-tokens", help="Maximum tokens"),
+        record: Path | None = typer.Option(
+            None,
+            "--record",
+            help="Record model responses to this cassette directory",
+        ),
+        replay: Path | None = typer.Option(
+            None,
+            "--replay",
+            help="Answer from this cassette directory instead of the model",
+        ),
+        replay_speed: float = typer.Option(
+            0.0,
+            "--replay-speed",
+            help="Replay latency factor: 1 real time, 10 ten times faster, 0 none",
+        ),
+        timeout: float | None = typer.Option(
+            None,
+            "--timeout",
+            help="Seconds allowed per prompt before returning a partial answer",
+        ),
+        max_steps: int | None = typer.Option(
+            None,
+            "--max-steps",
+            help="Maximum agent steps per prompt",
+        ),
+        token_budget: int | None = typer.Option(
+            None,
+            "--token-budget",
+            help="Maximum model tokens spent per prompt",
+        ),
 ) -> None:
     """Run the agent once with PROMPT."""
     config_model = apply_config(ctx, model, "model", DEFAULT_MODEL)
@@ -92,7 +129,10 @@ def run(  # noqa: PLR0913
     config_wire = apply_config(ctx, wire, "wire", None)
     config_top_p = apply_config(ctx, top_p, "top_p", None)
     config_max_tokens = apply_config(ctx, max_tokens, "max_tokens", None)
-    agent = create_agent(
+    config_timeout = apply_config(ctx, timeout, "timeout", None)
+    config_max_steps = apply_config(ctx, max_steps, "max_steps", None)
+    config_token_budget = apply_config(ctx, token_budget, "token_budget", None)
+    session = ChatSession(
         model_id=config_model,
         api_key=config_api_key,
         api_base=config_api_base,
@@ -102,11 +142,46 @@ def run(  # noqa: PLR0913
         wire=config_wire,
         top_p=config_top_p,
         max_tokens=config_max_tokens,
+        endpoints=ctx.obj.get("endpoints"),
+        balancer=ctx.obj.get("balancer"),
+        record=record,
+        replay=replay,
+        replay_speed=replay_speed,
+        timeout=config_timeout,
+        max_steps=config_max_steps,
+        token_budget=config_token_budget,
     )
-    result = agent.run(prompt)
+    result = session.ask(prompt)
     typer.echo(result)
 
 
+def chat_loop(
+    session: ChatSession,
+    agents: MultiChatSession | None = None,
+) -> None:
+    """Read prompts from stdin until EOF or ``exit``."""
+    while True:
+        try:
+            prompt = input("\u003e ")
+        except EOFError:
+            break
+        if not prompt:
+            continue
+        if prompt.strip().lower() in {"exit", "quit"}:
+            break
+        if prompt.strip() == "/memory":
+            typer.echo(memory_report(session, agents))
+            continue
+        if prompt.strip() == "/stats":
+            typer.echo(session.stats())
+            continue
+        if prompt.strip() == "/endpoints":
+            typer.echo(session.endpoint_status())
+            continue
+        answer = session.ask(prompt)
+        typer.echo(answer)
+
+
 def chat(  # noqa: PLR0913
         ctx: typer.Context,
         model: str | None = typer.Option(None, "--model"),
@@ -132,6 +207,51 @@ def chat(  # noqa: PLR0913
         wire: str | None = typer.Option(None, "--wire", help="Wire mode"),
         top_p: float | None = typer.Option(None, "--top-p", help="Nucleus sampling"),
         max_tokens: int | None = typer.Option(None, "--max-tokens", help="Maximum tokens"),
+        memory_soft_limit: int | None = typer.Option(
+            None,
+            "--memory-soft-limit",
+            help="Spill old steps to disk above this many bytes",
+        ),
+        memory_hard_limit: int | None = typer.Option(
+            None,
+            "--memory-hard-limit",
+            help="Evict the session above this many bytes",
+        ),
+        orchestrate: bool = typer.Option(  # noqa: FBT001
+            False,  # noqa: FBT003
+            "--orchestrate",
+            help="Give the agent the configured agents as tools",
+        ),
+        record: Path | None = typer.Option(
+            None,
+            "--record",
+            help="Record model responses to this cassette directory",
+        ),
+        replay: Path | None = typer.Option(
+            None,
+            "--replay",
+            help="Answer from this cassette directory instead of the model",
+        ),
+        replay_speed: float = typer.Option(
+            0.0,
+            "--replay-speed",
+            help="Replay latency factor: 1 real time, 10 ten times faster, 0 none",
+        ),
+        timeout: float | None = typer.Option(
+            None,
+            "--timeout",
+            help="Seconds allowed per prompt before returning a partial answer",
+        ),
+        max_steps: int | None = typer.Option(
+            None,
+            "--max-steps",
+            help="Maximum agent steps per prompt",
+        ),
+        token_budget: int | None = typer.Option(
+            None,
+            "--token-budget",
+            help="Maximum model tokens spent per prompt",
+        ),
 ) -> None:
     """Run an interactive chat session."""
     config_model = apply_config(ctx, model, "model", DEFAULT_MODEL)
@@ -143,6 +263,27 @@ def chat(  # noqa: PLR0913
     config_wire = apply_config(ctx, wire, "wire", None)
     config_top_p = apply_config(ctx, top_p, "top_p", None)
     config_max_tokens = apply_config(ctx, max_tokens, "max_tokens", None)
+    config_timeout = apply_config(ctx, timeout, "timeout", None)
+    config_max_steps = apply_config(ctx, max_steps, "max_steps", None)
+    config_token_budget = apply_config(ctx, token_budget, "token_budget", None)
+    config_soft_limit = apply_config(ctx, memory_soft_limit, "memory_soft_limit", None)
+    config_hard_limit = apply_config(ctx, memory_hard_limit, "memory_hard_limit", None)
+    config_spill_dir = ctx.obj.get("spill_dir")
+    config_endpoints = ctx.obj.get("endpoints")
+    config_balancer = ctx.obj.get("balancer")
+    config_orchestrator = (
+        create_orchestrator(
+            ctx.obj,
+            api_key=config_api_key,
+            api_base=config_api_base,
+            headers=config_headers,
+            record=record,
+            replay=replay,
+            replay_speed=replay_speed,
+        )
+        if orchestrate
+        else None
+    )
     session = ChatSession(
         model_id=config_model,
         api_key=config_api_key,
@@ -153,18 +294,24 @@ def chat(  # noqa: PLR0913
         wire=config_wire,
         top_p=config_top_p,
         max_tokens=config_max_tokens,
+        memory_soft_limit=config_soft_limit,
+        memory_hard_limit=config_hard_limit,
+        spill_dir=spill_path(config_spill_dir),
+        endpoints=config_endpoints,
+        balancer=config_balancer,
+        tools=config_orchestrator.tools() if config_orchestrator else None,
+        record=record,
+        replay=replay,
+        replay_speed=replay_speed,
+        timeout=config_timeout,
+        max_steps=config_max_steps,
+        token_budget=config_token_budget,
     )
-    while True:
-        try:
-            prompt = input("\u003e ")
-        except EOFError:
-            break
-        if not prompt:
-            continue
-        if prompt.strip().lower() in {"exit", "quit"}:
-            break
-        answer = session.ask(prompt)
-        typer.echo(answer)
+    try:
+        chat_loop(session, config_orchestrator.multi if config_orchestrator else None)
+    finally:
+        if config_orchestrator is not None:
+            config_orchestrator.shutdown()
 
 
 @cli.command()
@@ -193,6 +340,51 @@ def serve(  # noqa: PLR0913
         wire: str | None = typer.Option(None, "--wire", help="Wire mode"),
         top_p: float | None = typer.Option(None, "--top-p", help="Nucleus sampling"),
         max_tokens: int | None = typer.Option(None, "--max-tokens", help="Maximum tokens"),
+        memory_soft_limit: int | None = typer.Option(
+            None,
+            "--memory-soft-limit",
+            help="Spill old steps to disk above this many bytes",
+        ),
+        memory_hard_limit: int | None = typer.Option(
+            None,
+            "--memory-hard-limit",
+            help="Evict the session above this many bytes",
+        ),
+        orchestrate: bool = typer.Option(  # noqa: FBT001
+            False,  # noqa: FBT003
+            "--orchestrate",
+            help="Give the agent the configured agents as tools",
+        ),
+        record: Path | None = typer.Option(
+            None,
+            "--record",
+            help="Record model responses to this cassette directory",
+        ),
+        replay: Path | None = typer.Option(
+            None,
+            "--replay",
+            help="Answer from this cassette directory instead of the model",
+        ),
+        replay_speed: float = typer.Option(
+            0.0,
+            "--replay-speed",
+            help="Replay latency factor: 1 real time, 10 ten times faster, 0 none",
+        ),
+        timeout: float | None = typer.Option(
+            None,
+            "--timeout",
+            help="Seconds allowed per prompt before returning a partial answer",
+        ),
+        max_steps: int | None = typer.Option(
+            None,
+            "--max-steps",
+            help="Maximum agent steps per prompt",
+        ),
+        token_budget: int | None = typer.Option(
+            None,
+            "--token-budget",
+            help="Maximum model tokens spent per prompt",
+        ),
 ) -> None:
     """Launch the MCP server over stdio."""
     config_model = apply_config(ctx, model, "model", DEFAULT_MODEL)
@@ -204,6 +396,27 @@ def serve(  # noqa: PLR0913
     config_wire = apply_config(ctx, wire, "wire", None)
     config_top_p = apply_config(ctx, top_p, "top_p", None)
     config_max_tokens = apply_config(ctx, max_tokens, "max_tokens", None)
+    config_timeout = apply_config(ctx, timeout, "timeout", None)
+    config_max_steps = apply_config(ctx, max_steps, "max_steps", None)
+    config_token_budget = apply_config(ctx, token_budget, "token_budget", None)
+    config_soft_limit = apply_config(ctx, memory_soft_limit, "memory_soft_limit", None)
+    config_hard_limit = apply_config(ctx, memory_hard_limit, "memory_hard_limit", None)
+    config_spill_dir = ctx.obj.get("spill_dir")
+    config_endpoints = ctx.obj.get("endpoints")
+    config_balancer = ctx.obj.get("balancer")
+    config_orchestrator = (
+        create_orchestrator(
+            ctx.obj,
+            api_key=config_api_key,
+            api_base=config_api_base,
+            headers=config_headers,
+            record=record,
+            replay=replay,
+            replay_speed=replay_speed,
+        )
+        if orchestrate
+        else None
+    )
     anyio.run(
         lambda: server_main(
             model=config_model,
@@ -215,6 +428,18 @@ def serve(  # noqa: PLR0913
             wire=config_wire,
             top_p=config_top_p,
             max_tokens=config_max_tokens,
+            memory_soft_limit=config_soft_limit,
+            memory_hard_limit=config_hard_limit,
+            spill_dir=spill_path(config_spill_dir),
+            endpoints=config_endpoints,
+            balancer=config_balancer,
+            orchestrator=config_orchestrator,
+            record=record,
+            replay=replay,
+            replay_speed=replay_speed,
+            timeout=config_timeout,
+            max_steps=config_max_steps,
+            token_budget=config_token_budget,
         ),
     )
 
@@ -245,6 +470,51 @@ def tui(  # noqa: PLR0913
         wire: str | None = typer.Option(None, "--wire", help="Wire mode"),
         top_p: float | None = typer.Option(None, "--top-p", help="Nucleus sampling"),
         max_tokens: int | None = typer.Option(None, "--max-tokens", help="Maximum tokens"),
+        memory_soft_limit: int | None = typer.Option(
+            None,
+            "--memory-soft-limit",
+            help="Spill old steps to disk above this many bytes",
+        ),
+        memory_hard_limit: int | None = typer.Option(
+            None,
+            "--memory-hard-limit",
+            help="Evict the session above this many bytes",
+        ),
+        orchestrate: bool = typer.Option(  # noqa: FBT001
+            False,  # noqa: FBT003
+            "--orchestrate",
+            help="Give the agent the configured agents as tools",
+        ),
+        record: Path | None = typer.Option(
+            None,
+            "--record",
+            help="Record model responses to this cassette directory",
+        ),
+        replay: Path | None = typer.Option(
+            None,
+            "--replay",
+            help="Answer from this cassette directory instead of the model",
+        ),
+        replay_speed: float = typer.Option(
+            0.0,
+            "--replay-speed",
+            help="Replay latency factor: 1 real time, 10 ten times faster, 0 none",
+        ),
+        timeout: float | None = typer.Option(
+            None,
+            "--timeout",
+            help="Seconds allowed per prompt before returning a partial answer",
+        ),
+        max_steps: int | None = typer.Option(
+            None,
+            "--max-steps",
+            help="Maximum agent steps per prompt",
+        ),
+        token_budget: int | None = typer.Option(
+            None,
+            "--token-budget",
+            help="Maximum model tokens spent per prompt",
+        ),
 ) -> None:
     """Run the Textual chat interface."""
     config_model = apply_config(ctx, model, "model", DEFAULT_MODEL)
@@ -256,6 +526,27 @@ def tui(  # noqa: PLR0913
     config_wire = apply_config(ctx, wire, "wire", None)
     config_top_p = apply_config(ctx, top_p, "top_p", None)
     config_max_tokens = apply_config(ctx, max_tokens, "max_tokens", None)
+    config_timeout = apply_config(ctx, timeout, "timeout", None)
+    config_max_steps = apply_config(ctx, max_steps, "max_steps", None)
+    config_token_budget = apply_config(ctx, token_budget, "token_budget", None)
+    config_soft_limit = apply_config(ctx, memory_soft_limit, "memory_soft_limit", None)
+    config_hard_limit = apply_config(ctx, memory_hard_limit, "memory_hard_limit", None)
+    config_spill_dir = ctx.obj.get("spill_dir")
+    config_endpoints = ctx.obj.get("endpoints")
+    config_balancer = ctx.obj.get("balancer")
+    config_orchestrator = (
+        create_orchestrator(
+            ctx.obj,
+            api_key=config_api_key,
+            api_base=config_api_base,
+            headers=config_headers,
+            record=record,
+            replay=replay,
+            replay_speed=replay_speed,
+        )
+        if orchestrate
+        else None
+    )
     tui_main(
         model=config_model,
         api_key=config_api_key,
@@ -266,6 +557,18 @@ def tui(  # noqa: PLR0913
         wire=config_wire,
         top_p=config_top_p,
         max_tokens=config_max_tokens,
+        memory_soft_limit=config_soft_limit,
+        memory_hard_limit=config_hard_limit,
+        spill_dir=spill_path(config_spill_dir),
+        endpoints=config_endpoints,
+        balancer=config_balancer,
+        orchestrator=config_orchestrator,
+        record=record,
+        replay=replay,
+        replay_speed=replay_speed,
+        timeout=config_timeout,
+        max_steps=config_max_steps,
+        token_budget=config_token_budget,
     )
 
 
@@ -0,0 +1,202 @@
+from __future__ import annotations
+
+import threading
+import time
+from typing import TYPE_CHECKING, Any
+
+import openai
+
+from .budget import BudgetExceededError, current_budget
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterator, Sequence
+
+ROUTING_STRATEGIES = ("least-outstanding", "latency")
+
+LATENCY_SMOOTHING = 0.3
+
+# Errors that say nothing about the request itself, so another endpoint may
+# succeed. Anything else (bad request, auth, ...) would fail everywhere.
+RETRYABLE_ERRORS = (
+    openai.APIConnectionError,
+    openai.APITimeoutError,
+    openai.InternalServerError,
+    openai.RateLimitError,
+)
+
+
+class Endpoint:
+    """One model backend together with its load and circuit breaker state."""
+
+    def __init__(self, model: Any, weight: float = 1.0) -> None:
+        if weight <= 0:
+            msg = f"Endpoint weight must be positive, got {weight}"
+            raise ValueError(msg)
+        self.model = model
+        self.weight = weight
+        self.outstanding = 0
+        self.latency: float | None = None
+        self.failures = 0
+        self.opened_at: float | None = None
+        self.probing = False
+
+    def status(self) -> dict[str, object]:
+        return {
+            "model_id": getattr(self.model, "model_id", None),
+            "api_base": getattr(self.model, "api_base", None),
+            "weight": self.weight,
+            "outstanding": self.outstanding,
+            "latency": self.latency,
+            "failures": self.failures,
+            "open": self.opened_at is not None,
+        }
+
+
+class EndpointPool:
+    """Spread model calls over several endpoints and fail over on errors.
+
+    Endpoints that fail ``failure_threshold`` times in a row, or answer slower
+    than ``slow_threshold`` seconds, are ejected for ``cooldown`` seconds. After
+    the cooldown a single probe call is let through; success closes the circuit
+    again, failure reopens it.
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        endpoints: Sequence[Endpoint],
+        routing: str = "least-outstanding",
+        failure_threshold: int = 3,
+        cooldown: float = 30.0,
+        slow_threshold: float | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if not endpoints:
+            msg = "EndpointPool needs at least one endpoint"
+            raise ValueError(msg)
+        if routing not in ROUTING_STRATEGIES:
+            msg = f"Unknown routing '{routing}'. Use one of {ROUTING_STRATEGIES}."
+            raise ValueError(msg)
+        self.endpoints = list(endpoints)
+        self.routing = routing
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.slow_threshold = slow_threshold
+        self._clock = clock
+        self._lock = threading.Lock()
+
+    def __getattr__(self, name: str) -> Any:
+        if name == "endpoints":
+            raise AttributeError(name)
+        return getattr(self.endpoints[0].model, name)
+
+    def __call__(self, *args: Any, **kwargs: Any) -> Any:
+        return self.generate(*args, **kwargs)
+
+    def generate(self, *args: Any, **kwargs: Any) -> Any:
+        tried: list[Endpoint] = []
+        last_error: Exception | None = None
+        budget = current_budget()
+        for _ in self.endpoints:
+            if budget is not None:
+                # Each attempt only gets the time the earlier ones left over.
+                if budget.expired():
+                    msg = "Budget exhausted before the next endpoint attempt"
+                    raise BudgetExceededError(msg) from last_error
+                remaining = budget.remaining()
+                if remaining is not None:
+                    kwargs["timeout"] = remaining
+            endpoint = self._acquire(tried)
+            start = self._clock()
+            try:
+                result = endpoint.model.generate(*args, **kwargs)
+            except RETRYABLE_ERRORS as exc:
+                if budget is not None and budget.expired():
+                    # Our deadline ran out, which says nothing about the endpoint.
+                    self._cancel(endpoint)
+                    raise
+                self._release(endpoint, self._clock() - start, failed=True)
+                tried.append(endpoint)
+                last_error = exc
+                continue
+            except BaseException:
+                self._cancel(endpoint)
+                raise
+            self._release(endpoint, self._clock() - start, failed=False)
+            return result
+        raise last_error or RuntimeError("No endpoint available")
+
+    def generate_stream(self, *args: Any, **kwargs: Any) -> Iterator[Any]:
+        endpoint = self._acquire([])
+        start = self._clock()
+        failed: bool | None = None
+        try:
+            yield from endpoint.model.generate_stream(*args, **kwargs)
+            failed = False
+        except RETRYABLE_ERRORS:
+            failed = True
+            raise
+        finally:
+            # Closed early by the consumer or a non-retryable error.
+            if failed is None:
+                self._cancel(endpoint)
+            else:
+                self._release(endpoint, self._clock() - start, failed=failed)
+
+    def status(self) -> list[dict[str, object]]:
+        with self._lock:
+            return [endpoint.status() for endpoint in self.endpoints]
+
+    def _available(self, endpoint: Endpoint, now: float) -> bool:
+        if endpoint.opened_at is None:
+            return True
+        return not endpoint.probing and now - endpoint.opened_at >= self.cooldown
+
+    def _score(self, endpoint: Endpoint) -> float:
+        load = (endpoint.outstanding + 1) / endpoint.weight
+        if self.routing == "latency":
+            return (endpoint.latency or 0.0) * load
+        return load
+
+    def _acquire(self, exclude: list[Endpoint]) -> Endpoint:
+        with self._lock:
+            now = self._clock()
+            candidates = [e for e in self.endpoints if e not in exclude]
+            if not candidates:
+                msg = "No endpoint available"
+                raise RuntimeError(msg)
+            ready = [e for e in candidates if self._available(e, now)]
+            if not ready:
+                # Every circuit is open: probe the one ejected the longest ago.
+                ready = [min(candidates, key=lambda e: e.opened_at or 0.0)]
+            endpoint = min(ready, key=self._score)
+            if endpoint.opened_at is not None:
+                endpoint.probing = True
+            endpoint.outstanding += 1
+            return endpoint
+
+    def _cancel(self, endpoint: Endpoint) -> None:
+        """Release ``endpoint`` without counting the call for or against it."""
+        with self._lock:
+            endpoint.outstanding -= 1
+            endpoint.probing = False
+
+    def _release(self, endpoint: Endpoint, elapsed: float, *, failed: bool) -> None:
+        with self._lock:
+            endpoint.outstanding -= 1
+            endpoint.probing = False
+            if not failed:
+                if endpoint.latency is None:
+                    endpoint.latency = elapsed
+                else:
+                    endpoint.latency += LATENCY_SMOOTHING * (elapsed - endpoint.latency)
+            slow = self.slow_threshold is not None and elapsed > self.slow_threshold
+            if failed or slow:
+                endpoint.failures += 1
+                if (
+                    endpoint.opened_at is not None
+                    or endpoint.failures >= self.failure_threshold
+                ):
+                    endpoint.opened_at = self._clock()
+            else:
+                endpoint.failures = 0
+                endpoint.opened_at = None
@@ -0,0 +1,215 @@
+from __future__ import annotations
+
+import keyword
+import re
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import TYPE_CHECKING, Any
+
+from smolagents import Tool
+
+from .agent import MultiChatSession, create_multi_session
+from .budget import Budget, current_budget
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+DEFAULT_MAX_CONCURRENCY = 4
+
+# Tool names the lead agent already uses.
+RESERVED_TOOL_NAMES = frozenset({"dispatch", "final_answer"})
+
+# Extra wait after a sub-agent deadline so it can hand back a partial answer.
+RESULT_GRACE = 1.0
+
+
+def tool_name(name: str) -> str:
+    """Turn an agent name such as ``o3-cold`` into a valid tool name."""
+    cleaned = re.sub(r"\W", "_", name)
+    if not cleaned or cleaned[0].isdigit() or keyword.iskeyword(cleaned):
+        cleaned = f"agent_{cleaned}"
+    return cleaned
+
+
+class Orchestrator:
+    """Run sub-agent calls on a bounded thread pool with per-agent timeouts."""
+
+    def __init__(
+        self,
+        multi: MultiChatSession,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        timeout: float | None = None,
+        timeouts: dict[str, float] | None = None,
+    ) -> None:
+        self.multi = multi
+        self.timeout = timeout
+        self.timeouts = timeouts or {}
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_concurrency,
+            thread_name_prefix="yowon-agent",
+        )
+        # A sub-session keeps conversation state, so it serves one call at a time.
+        self._locks = {name: threading.Lock() for name in multi.options()}
+
+    def submit(self, name: str, prompt: str) -> Future[str]:
+        if name not in self._locks:
+            raise KeyError(name)
+        return self._executor.submit(self._ask, name, prompt, self._budget(name))
+
+    def ask(self, name: str, prompt: str) -> str:
+        return self._result(name, self.submit(name, prompt))
+
+    def dispatch(self, tasks: dict[str, str]) -> dict[str, str]:
+        """Send every task to its agent at once and collect all answers."""
+        futures = {name: self.submit(name, prompt) for name, prompt in tasks.items()}
+        return {name: self._result(name, future) for name, future in futures.items()}
+
+    def tools(self) -> list[Tool]:
+        """Return one tool per agent plus ``dispatch``.
+
+        Raises ``ValueError`` when two agents map to the same tool name or an
+        agent would shadow one of the lead's own tools.
+        """
+        owners: dict[str, str] = {}
+        for name in self.multi.options():
+            cleaned = tool_name(name)
+            if cleaned in RESERVED_TOOL_NAMES:
+                msg = f"Agent '{name}' clashes with the built-in '{cleaned}' tool"
+                raise ValueError(msg)
+            if cleaned in owners:
+                msg = (
+                    f"Agents '{owners[cleaned]}' and '{name}' both map to tool "
+                    f"name '{cleaned}'; rename one of them"
+                )
+                raise ValueError(msg)
+            owners[cleaned] = name
+        tools: list[Tool] = [
+            AgentTool(self, name, self.multi.get_role(name))
+            for name in self.multi.options()
+        ]
+        tools.append(DispatchTool(self))
+        return tools
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _budget(self, name: str) -> Budget | None:
+        """Return the budget for a sub-call, bounded by and charged to the caller's."""
+        parent = current_budget()
+        limits = [self.timeouts.get(name, self.timeout)]
+        if parent is not None:
+            limits.append(parent.remaining())
+        timeouts = [limit for limit in limits if limit is not None]
+        if parent is None and not timeouts:
+            return None
+        return Budget(
+            timeout=min(timeouts) if timeouts else None,
+            parent=parent,
+        ).start()
+
+    def _ask(self, name: str, prompt: str, budget: Budget | None) -> str:
+        with self._locks[name]:
+            return self.multi.ask(prompt, name, budget)
+
+    def _result(self, name: str, future: Future[str]) -> str:
+        timeout = self.timeouts.get(name, self.timeout)
+        try:
+            return future.result(
+                timeout=None if timeout is None else timeout + RESULT_GRACE,
+            )
+        except FutureTimeoutError:
+            future.cancel()
+            return f"Agent '{name}' timed out after {timeout} seconds."
+        except Exception as exc:  # noqa: BLE001 - report sub-agent failures to the lead
+            return f"Agent '{name}' failed: {exc}"
+
+
+class AgentTool(Tool):
+    """Expose one configured agent as a tool of the lead agent."""
+
+    inputs = {  # noqa: RUF012
+        "prompt": {"type": "string", "description": "Task for the agent."},
+    }
+    output_type = "string"
+
+    def __init__(
+        self,
+        orchestrator: Orchestrator,
+        agent_name: str,
+        role: str | None = None,
+    ) -> None:
+        self.orchestrator = orchestrator
+        self.agent_name = agent_name
+        self.name = tool_name(agent_name)
+        self.description = f"Ask the '{agent_name}' agent. Role: {role or 'general'}."
+        super().__init__()
+
+    def forward(self, prompt: str) -> str:
+        return self.orchestrator.ask(self.agent_name, prompt)
+
+
+class DispatchTool(Tool):
+    """Fan independent tasks out to several agents in parallel."""
+
+    name = "dispatch"
+    description = (
+        "Run independent tasks on several agents at the same time. "
+        "`tasks` maps agent names to prompts; returns a dict of agent name to "
+        "answer. Prefer this over calling agent tools one after another."
+    )
+    inputs = {  # noqa: RUF012
+        "tasks": {
+            "type": "object",
+            "description": "Mapping of agent name to the prompt for that agent.",
+        },
+    }
+    output_type = "object"
+
+    def __init__(self, orchestrator: Orchestrator) -> None:
+        self.orchestrator = orchestrator
+        super().__init__()
+
+    def forward(self, tasks: dict[str, str]) -> dict[str, str]:
+        options = self.orchestrator.multi.options()
+        names = {tool_name(name): name for name in options} | {n: n for n in options}
+        unknown = sorted(set(tasks) - set(names))
+        if unknown:
+            msg = f"Unknown agents {unknown}. Choose from {options}."
+            raise KeyError(msg)
+        return self.orchestrator.dispatch(
+            {names[name]: prompt for name, prompt in tasks.items()},
+        )
+
+
+def create_orchestrator(  # noqa: PLR0913
+    config: dict[str, Any],
+    *,
+    api_key: str | None = None,
+    api_base: str | None = None,
+    headers: dict[str, str] | None = None,
+    record: Path | None = None,
+    replay: Path | None = None,
+    replay_speed: float = 0.0,
+) -> Orchestrator:
+    """Build an ``Orchestrator`` over the agents in configuration."""
+
+    multi = create_multi_session(
+        config,
+        api_key=api_key,
+        api_base=api_base,
+        headers=headers,
+        record=record,
+        replay=replay,
+        replay_speed=replay_speed,
+    )
+    settings = config.get("orchestrator", {})
+    agents = config.get("agents", {})
+    return Orchestrator(
+        multi,
+        max_concurrency=settings.get("max_concurrency", DEFAULT_MAX_CONCURRENCY),
+        timeout=settings.get("timeout"),
+        timeouts={
+            name: opts["timeout"] for name, opts in agents.items() if "timeout" in opts
+        },
+    )
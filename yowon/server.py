@@ -1,26 +1,109 @@
 from __future__ import annotations
 
+import threading
+from typing import TYPE_CHECKING, Any
+
+import anyio.to_thread
 from mcp.server.fastmcp import FastMCP
 
 from .agent import (
     DEFAULT_MODEL,
     ChatSession,
+    MultiChatSession,
+    memory_report,
 )
+from .budget import Budget
+from .singleflight import SingleFlight, flight_key
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from .orchestrator import Orchestrator
 
 server = FastMCP(name="yowon")
 
 session: ChatSession | None = None
+agents: MultiChatSession | None = None
+settings: dict[str, object] = {}
+
+flights = SingleFlight()
+_session_lock = threading.Lock()
+
+
+def _ask(prompt: str, budget: Budget) -> str:
+    if session is None:
+        msg = "Session not initialized"
+        raise RuntimeError(msg)
+    # The agent keeps conversation state and must not run two prompts at once.
+    with _session_lock:
+        return session.ask(prompt, budget)
+
+
+def _ask_fresh(prompt: str, budget: Budget) -> str:
+    if session is None:
+        msg = "Session not initialized"
+        raise RuntimeError(msg)
+    return session.fork().ask(prompt, budget)
+
+
+@server.tool()
+async def chat(
+    prompt: str,
+    timeout: float | None = None,  # noqa: ASYNC109 - tool argument
+    max_steps: int | None = None,
+    token_budget: int | None = None,
+    stateless: bool = False,  # noqa: FBT001, FBT002 - tool argument
+) -> str:
+    """Generate a reply from the assistant.
+
+    ``timeout`` (seconds), ``max_steps`` and ``token_budget`` bound the agent run;
+    when one runs out the best partial answer is returned. With ``stateless``
+    the prompt is answered without the conversation history and identical
+    in-flight stateless calls share one answer.
+    """
+    budget = Budget(timeout, max_steps, token_budget).start()
+    if not stateless:
+        return await anyio.to_thread.run_sync(_ask, prompt, budget)
+    key = flight_key("stateless", settings, prompt, timeout, max_steps, token_budget)
+    return await anyio.to_thread.run_sync(
+        flights.do,
+        key,
+        lambda: _ask_fresh(prompt, budget),
+    )
 
 
-@server.tool
-def chat(prompt: str) -> str:
-    """Generate a reply from the assistant."""
+@server.tool()
+async def memory() -> dict[str, Any]:
+    """Report approximate memory held by the chat session and its sub-agents."""
     if session is None:
         msg = "Session not initialized"
         raise RuntimeError(msg)
-    return session.ask(prompt)
+    return await anyio.to_thread.run_sync(memory_report, session, agents)
 
 
+@server.tool()
+def stats() -> dict[str, dict[str, float]]:
+    """Report token usage and prompt cache hits for the last turn and overall."""
+    if session is None:
+        msg = "Session not initialized"
+        raise RuntimeError(msg)
+    return session.stats()
+
+
+@server.tool()
+def endpoints() -> list[dict[str, object]]:
+    """Report load, latency and circuit state of each model endpoint."""
+    if session is None:
+        msg = "Session not initialized"
+        raise RuntimeError(msg)
+    return session.endpoint_status()
+
+
+@server.tool()
+def coalescing() -> dict[str, int]:
+    """Report how many stateless chat calls shared an identical in-flight call."""
+    return flights.stats()
+
 
 def main(  # noqa: PLR0913
     model: str = DEFAULT_MODEL,
@@ -32,8 +115,30 @@ def main(  # noqa: PLR0913
     wire: str | None = None,
     top_p: float | None = None,
     max_tokens: int | None = None,
+    memory_soft_limit: int | None = None,
+    memory_hard_limit: int | None = None,
+    spill_dir: Path | None = None,
+    endpoints: list[dict[str, Any]] | None = None,
+    balancer: dict[str, Any] | None = None,
+    orchestrator: Orchestrator | None = None,
+    record: Path | None = None,
+    replay: Path | None = None,
+    replay_speed: float = 0.0,
+    timeout: float | None = None,
+    max_steps: int | None = None,
+    token_budget: int | None = None,
 ) -> None:
-    global session  # noqa: PLW0603
+    global session, agents  # noqa: PLW0603
+    agents = orchestrator.multi if orchestrator else None
+    settings.update(
+        model=model,
+        api_base=api_base,
+        temperature=temperature,
+        reasoning_effort=reasoning_effort,
+        wire=wire,
+        top_p=top_p,
+        max_tokens=max_tokens,
+    )
     session = ChatSession(
         model_id=model,
         api_key=api_key,
@@ -44,8 +149,24 @@ def main(  # noqa: PLR0913
         wire=wire,
         top_p=top_p,
         max_tokens=max_tokens,
+        memory_soft_limit=memory_soft_limit,
+        memory_hard_limit=memory_hard_limit,
+        spill_dir=spill_dir,
+        endpoints=endpoints,
+        balancer=balancer,
+        tools=orchestrator.tools() if orchestrator else None,
+        record=record,
+        replay=replay,
+        replay_speed=replay_speed,
+        timeout=timeout,
+        max_steps=max_steps,
+        token_budget=token_budget,
     )
-    server.run("stdio")
+    try:
+        server.run("stdio")
+    finally:
+        if orchestrator is not None:
+            orchestrator.shutdown()
 
 
 
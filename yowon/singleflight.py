@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+from concurrent.futures import Future
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+
+def flight_key(*parts: object) -> str:
+    """Return a stable hash identifying a request built from ``parts``."""
+    payload = json.dumps(parts, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class SingleFlight:
+    """Share one running computation between identical concurrent calls.
+
+    The first caller for a key runs ``fn``; callers arriving while it is still
+    running wait for the same result (or exception) instead of starting their
+    own. Nothing is cached once the computation finishes.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._flights: dict[str, Future[str]] = {}
+        self.calls = 0
+        self.coalesced = 0
+
+    def do(self, key: str, fn: Callable[[], str]) -> str:
+        with self._lock:
+            self.calls += 1
+            future = self._flights.get(key)
+            leader = future is None
+            if future is None:
+                future = Future()
+                self._flights[key] = future
+            else:
+                self.coalesced += 1
+        if not leader:
+            return future.result()
+        try:
+            result = fn()
+        except BaseException as exc:
+            future.set_exception(exc)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._flights[key]
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "coalesced": self.coalesced,
+                "in_flight": len(self._flights),
+            }
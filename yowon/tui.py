@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+from typing import TYPE_CHECKING, Any
+
 from textual.app import App, ComposeResult
 from textual.containers import Container
 from textual.reactive import reactive
@@ -8,8 +10,14 @@ from textual.widgets import Input, Static
 from yowon.agent import (
     DEFAULT_MODEL,
     ChatSession,
+    memory_report,
 )
 
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from .orchestrator import Orchestrator
+
 
 class ChatView(Container):
     messages: reactive[str] = reactive("")
@@ -49,8 +57,21 @@ class YowonApp(App):
         wire: str | None = None,
         top_p: float | None = None,
         max_tokens: int | None = None,
+        memory_soft_limit: int | None = None,
+        memory_hard_limit: int | None = None,
+        spill_dir: Path | None = None,
+        endpoints: list[dict[str, Any]] | None = None,
+        balancer: dict[str, Any] | None = None,
+        orchestrator: Orchestrator | None = None,
+        record: Path | None = None,
+        replay: Path | None = None,
+        replay_speed: float = 0.0,
+        timeout: float | None = None,
+        max_steps: int | None = None,
+        token_budget: int | None = None,
     ) -> None:
         super().__init__()
+        self.agents = orchestrator.multi if orchestrator else None
         self.session = ChatSession(
             model_id=model,
             api_key=api_key,
@@ -61,6 +82,18 @@ class YowonApp(App):
             wire=wire,
             top_p=top_p,
             max_tokens=max_tokens,
+            memory_soft_limit=memory_soft_limit,
+            memory_hard_limit=memory_hard_limit,
+            spill_dir=spill_dir,
+            endpoints=endpoints,
+            balancer=balancer,
+            tools=orchestrator.tools() if orchestrator else None,
+            record=record,
+            replay=replay,
+            replay_speed=replay_speed,
+            timeout=timeout,
+            max_steps=max_steps,
+            token_budget=token_budget,
         )
 
     def compose(self) -> ComposeResult:
@@ -72,6 +105,17 @@ class YowonApp(App):
         prompt = event.value
         self.query_one(Input).value = ""
         self.query_one(ChatView).add_message(f"> {prompt}")
+        if prompt.strip() == "/memory":
+            usage = memory_report(self.session, self.agents)
+            self.query_one(ChatView).add_message(str(usage))
+            return
+        if prompt.strip() == "/stats":
+            self.query_one(ChatView).add_message(str(self.session.stats()))
+            return
+        if prompt.strip() == "/endpoints":
+            status = self.session.endpoint_status()
+            self.query_one(ChatView).add_message(str(status))
+            return
         answer = self.session.ask(prompt)
         self.query_one(ChatView).add_message(answer)
 
@@ -88,18 +132,46 @@ def main(  # noqa: PLR0913
     wire: str | None = None,
     top_p: float | None = None,
     max_tokens: int | None = None,
+    memory_soft_limit: int | None = None,
+    memory_hard_limit: int | None = None,
+    spill_dir: Path | None = None,
+    endpoints: list[dict[str, Any]] | None = None,
+    balancer: dict[str, Any] | None = None,
+    orchestrator: Orchestrator | None = None,
+    record: Path | None = None,
+    replay: Path | None = None,
+    replay_speed: float = 0.0,
+    timeout: float | None = None,
+    max_steps: int | None = None,
+    token_budget: int | None = None,
 ) -> None:
-    YowonApp(
-        model=model,
-        api_key=api_key,
-        api_base=api_base,
-        headers=headers,
-        temperature=temperature,
-        reasoning_effort=reasoning_effort,
-        wire=wire,
-        top_p=top_p,
-        max_tokens=max_tokens,
-    ).run()
+    try:
+        YowonApp(
+            model=model,
+            api_key=api_key,
+            api_base=api_base,
+            headers=headers,
+            temperature=temperature,
+            reasoning_effort=reasoning_effort,
+            wire=wire,
+            top_p=top_p,
+            max_tokens=max_tokens,
+            memory_soft_limit=memory_soft_limit,
+            memory_hard_limit=memory_hard_limit,
+            spill_dir=spill_dir,
+            endpoints=endpoints,
+            balancer=balancer,
+            orchestrator=orchestrator,
+            record=record,
+            replay=replay,
+            replay_speed=replay_speed,
+            timeout=timeout,
+            max_steps=max_steps,
+            token_budget=token_budget,
+        ).run()
+    finally:
+        if orchestrator is not None:
+            orchestrator.shutdown()
 
 
 
@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+from typing import Any
+
+from smolagents.memory import ActionStep
+
+
+def _field(obj: object, name: str) -> Any:
+    if isinstance(obj, dict):
+        return obj.get(name)
+    return getattr(obj, name, None)
+
+
+def cached_tokens(message: object) -> int:
+    """Return the prompt tokens the provider served from its prompt cache."""
+    usage = _field(_field(message, "raw"), "usage")
+    details = _field(usage, "prompt_tokens_details")
+    return _field(details, "cached_tokens") or _field(usage, "cached_tokens") or 0
+
+
+def turn_stats(steps: list[object]) -> dict[str, float]:
+    """Sum token usage and prompt cache hits over the steps of one turn.
+
+    ``steps`` counts agent actions only; task and planning entries are skipped,
+    although the tokens of planning calls are included.
+    """
+    input_tokens = output_tokens = cached = 0
+    for step in steps:
+        usage = getattr(step, "token_usage", None)
+        if usage is not None:
+            input_tokens += usage.input_tokens
+            output_tokens += usage.output_tokens
+        cached += cached_tokens(getattr(step, "model_output_message", None))
+    return {
+        "steps": sum(isinstance(step, ActionStep) for step in steps),
+        "input_tokens": input_tokens,
+        "output_tokens": output_tokens,
+        "cached_tokens": cached,
+        "cache_hit_ratio": cached / input_tokens if input_tokens else 0.0,
+    }